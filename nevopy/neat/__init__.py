@@ -28,14 +28,23 @@
 from nevopy.neat.config import NeatConfig
 
 # Genes
+from nevopy.neat.genes import activate_batch
 from nevopy.neat.genes import align_connections
+from nevopy.neat.genes import align_innovation_ids
+from nevopy.neat.genes import array_pool
+from nevopy.neat.genes import ArrayPool
 from nevopy.neat.genes import ConnectionGene
+from nevopy.neat.genes import GenomeArrays
 from nevopy.neat.genes import NodeGene
+from nevopy.neat.genes import register_activation
 
 # Genomes
 from nevopy.neat.genomes import FixTopNeatGenome
 from nevopy.neat.genomes import NeatGenome
 
+# GPU
+from nevopy.neat._gpu import forward_population
+
 # ID handler
 from nevopy.neat.id_handler import IdHandler
 
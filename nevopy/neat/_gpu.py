@@ -0,0 +1,201 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" GPU backend, based on `CuPy <https://cupy.dev/>`_, for the evaluation of
+whole populations of :class:`.NeatGenome`.
+
+`CuPy` isn't a required dependency of `NEvoPy`; it's only imported when
+:func:`forward_population` is called.
+"""
+
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+import nevopy as ne
+from nevopy.neat import _kernels
+
+#: Elementwise CuPy kernel that applies the native activation functions. It's
+#: only created when first needed.
+_ACT_KERNEL = None
+
+
+def _import_cupy() -> Tuple[Any, Any]:
+    """ Imports :mod:`cupy` and :mod:`cupyx.scipy.sparse`.
+
+    Raises:
+        ModuleNotFoundError: If :mod:`cupy` is not found.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import cupy
+        import cupyx.scipy.sparse
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError(
+            "Couldn't find 'cupy'! To evaluate genomes on the GPU, make sure "
+            "you've it installed.\nYou can install 'cupy' using pip (choose "
+            "the package matching your CUDA version):\n"
+            "\t$ pip install cupy-cuda11x"
+        ) from e
+    return cupy, cupyx.scipy.sparse
+
+
+def _activation_kernel(cupy: Any) -> Any:
+    """ Returns the elementwise kernel that applies the native activation
+    functions (see :attr:`.NUM_NATIVE_ACTIVATIONS`).
+    """
+    global _ACT_KERNEL  # pylint: disable=global-statement
+    if _ACT_KERNEL is None:
+        _ACT_KERNEL = cupy.ElementwiseKernel(
+            "float32 z, int16 func_id",
+            "float32 a",
+            """
+            if (func_id == 1) {
+                a = 1 / (1 + exp(-fminf(fmaxf(z, -64.0f), 64.0f)));
+            } else if (func_id == 2) {
+                a = 1 / (1 + exp(-fminf(fmaxf(4.9f * z, -64.0f), 64.0f)));
+            } else {
+                a = z;
+            }
+            """,
+            "nevopy_neat_activate",
+        )
+    return _ACT_KERNEL
+
+
+def forward_population(genomes: Sequence["ne.neat.NeatGenome"],
+                       inputs: np.ndarray) -> np.ndarray:
+    """ Feeds the given inputs to a population of genomes on the GPU.
+
+    Equivalent to calling :meth:`.NeatGenome.process` on each genome (with its
+    own input), including the update of the activations of the genomes' nodes.
+    The genomes are evaluated together: the networks are treated as a single
+    graph whose adjacency matrix is block-diagonal. For each level of their
+    evaluation schedules (see :meth:`.NeatGenome.evaluation_levels`), the
+    weighted sums of all the nodes in the level, from all the genomes, are
+    computed with one sparse matrix-vector product, followed by a single
+    elementwise kernel that applies the activation functions.
+
+    Note:
+        Only the natively supported activation functions are available on the
+        GPU (see :attr:`.NUM_NATIVE_ACTIVATIONS`).
+
+    Args:
+        genomes (Sequence[NeatGenome]): The genomes to be evaluated. They must
+            all have the same number of input and output nodes.
+        inputs (np.ndarray): Array with shape `(len(genomes), num_inputs)`. The
+            row `i` contains the input to be fed to the :math:`i^{th}` genome.
+
+    Returns:
+        A numpy array with shape `(len(genomes), num_outputs)` containing the
+        outputs of the genomes. If no genomes are given, an array with shape
+        `(0, 0)` is returned.
+
+    Raises:
+        ModuleNotFoundError: If :mod:`cupy` is not found.
+        InvalidInputError: If the shape of the inputs doesn't match the number
+            of genomes and the number of input nodes.
+        ValueError: If the genomes don't have the same number of output nodes
+            or if a genome uses an activation function not supported on the
+            GPU.
+    """
+    cupy, sparse = _import_cupy()
+    if len(genomes) == 0:
+        return np.empty((0, 0), dtype=np.float64)
+
+    inputs = np.asarray(inputs, dtype=np.float32)
+    if (inputs.ndim != 2 or len(inputs) != len(genomes)
+            or any(len(g.input_nodes) != inputs.shape[1] for g in genomes)):
+        raise ne.InvalidInputError(
+            "The inputs must have shape (num_genomes, num_inputs)! Got inputs "
+            f"with shape {inputs.shape} for {len(genomes)} genomes."
+        )
+    num_outputs = len(genomes[0].output_nodes)
+    if any(len(g.output_nodes) != num_outputs for g in genomes):
+        raise ValueError(
+            "All the genomes must have the same number of output nodes!"
+        )
+
+    # concatenating the activations of the genomes' nodes (host side)
+    offsets = np.zeros(len(genomes) + 1, dtype=np.int64)
+    np.cumsum([g.gene_arrays.num_nodes for g in genomes], out=offsets[1:])
+    act = np.empty(offsets[-1], dtype=np.float32)
+    genome_levels = []  # type: List[List[ne.neat.genomes.EvalLevel]]
+    genome_weights = []  # type: List[np.ndarray]
+    out_rows = []  # type: List[np.ndarray]
+    for genome, x, offset in zip(genomes, inputs, offsets):
+        arrays = genome.gene_arrays
+        arrays.node_act[genome.input_rows()] = x
+        act[offset:offset + arrays.num_nodes] = \
+            arrays.node_act[:arrays.num_nodes]
+        genome_levels.append(genome.evaluation_levels())
+        genome_weights.append(genome.forward_weights())
+        out_rows.append(genome.output_rows() + offset)
+
+    # processing the levels; stale connections read the previous activation
+    # of their source node, stored in the second half of `act_gpu`
+    num_nodes = len(act)
+    act_gpu = cupy.asarray(np.concatenate([act, act]))
+    activate = _activation_kernel(cupy)
+    for level_idx in range(max(len(levels) for levels in genome_levels)):
+        nodes, func_ids, weights, cols, dest = [], [], [], [], []
+        num_level_nodes = 0
+        for genome, levels, g_weights, offset in zip(
+                genomes, genome_levels, genome_weights, offsets):
+            if level_idx >= len(levels):
+                continue
+            level = levels[level_idx]
+            arrays = genome.gene_arrays
+            level_func_ids = arrays.node_func_id[level.nodes]
+            if np.any(level_func_ids >= _kernels.NUM_NATIVE_ACTIVATIONS):
+                raise ValueError(
+                    "Only the native activation functions (linear, sigmoid "
+                    "and steepened sigmoid) are supported on the GPU!"
+                )
+            nodes.append(level.nodes + offset)
+            func_ids.append(level_func_ids)
+            weights.append(g_weights[level.edges])
+            cols.append(arrays.conn_from[level.edges] + offset
+                        + np.where(level.fresh, 0, num_nodes))
+            dest.append(level.local_dest + num_level_nodes)
+            num_level_nodes += len(level.nodes)
+
+        nodes_gpu = cupy.asarray(np.concatenate(nodes))
+        z_matrix = sparse.coo_matrix(
+            (cupy.asarray(np.concatenate(weights)),
+             (cupy.asarray(np.concatenate(dest)),
+              cupy.asarray(np.concatenate(cols)))),
+            shape=(num_level_nodes, 2 * num_nodes),
+        ).tocsr()
+        act_gpu[nodes_gpu] = activate(
+            z_matrix.dot(act_gpu),
+            cupy.asarray(np.concatenate(func_ids)),
+        )
+
+    # copying the new activations back to the genomes
+    act = cupy.asnumpy(act_gpu[:num_nodes])
+    for genome, offset in zip(genomes, offsets):
+        arrays = genome.gene_arrays
+        arrays.node_act[:arrays.num_nodes] = \
+            act[offset:offset + arrays.num_nodes]
+    return np.stack([act[rows] for rows in out_rows]).astype(np.float64)
@@ -0,0 +1,197 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Low-level kernels used by the NEAT implementation.
+
+The kernels operate directly on the numpy arrays of :class:`.GenomeArrays`. If
+`numba` is installed (and can be loaded), they are JIT-compiled to machine
+code. Otherwise, they run as regular Python functions.
+"""
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # not installed or broken (e.g., incompatible with numpy)
+    numba = None
+
+
+def jit(func: Optional[Callable] = None, **options) -> Callable:
+    """ Compiles the given function with :func:`numba.njit`, if `numba` is
+    available. Otherwise, returns the function unchanged.
+
+    Can be used both as ``@jit`` and as ``@jit(**options)``, where `options`
+    are passed to :func:`numba.njit`.
+    """
+    if func is None:
+        return lambda f: jit(f, **options)
+    if numba is None:
+        return func
+    return numba.njit(cache=True, **options)(func)
+
+
+@jit
+def merge_sorted_ids(ids1: np.ndarray,
+                     ids2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Merges two sorted arrays of unique innovation IDs.
+
+    Performs a single linear (two-pointer) walk over both arrays.
+
+    Returns:
+        A tuple with two arrays of the same size (the size of the union of the
+        IDs). For each ID in the union (in ascending order), they contain the
+        index of the ID in `ids1` and in `ids2`, respectively, or -1 if the ID
+        is missing from the array.
+    """
+    n1, n2 = len(ids1), len(ids2)
+    idx1 = np.full(n1 + n2, -1, dtype=np.int32)
+    idx2 = np.full(n1 + n2, -1, dtype=np.int32)
+    i = j = k = 0
+    while i < n1 and j < n2:
+        if ids1[i] == ids2[j]:
+            idx1[k] = i
+            idx2[k] = j
+            i += 1
+            j += 1
+        elif ids1[i] < ids2[j]:
+            idx1[k] = i
+            i += 1
+        else:
+            idx2[k] = j
+            j += 1
+        k += 1
+
+    while i < n1:
+        idx1[k] = i
+        i += 1
+        k += 1
+
+    while j < n2:
+        idx2[k] = j
+        j += 1
+        k += 1
+    return idx1[:k], idx2[:k]
+
+
+#: Minimum total number of IDs for which :func:`merge_sorted_ids_numpy` is
+#: faster than the pure Python version of :func:`merge_sorted_ids`. Below it,
+#: the overhead of the numpy calls dominates.
+NUMPY_MERGE_MIN_SIZE = 64
+
+
+def merge_sorted_ids_numpy(ids1: np.ndarray,
+                           ids2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Version of :func:`merge_sorted_ids` built on numpy's set routines.
+
+    The union of the IDs is computed with :func:`numpy.union1d` and each ID is
+    located in the arrays with :func:`numpy.searchsorted`, so the merge is done
+    in C. Used in place of :func:`merge_sorted_ids` for large arrays when
+    `numba` isn't available (the two-pointer walk is slow in pure Python).
+    """
+    union = np.union1d(ids1, ids2)
+    out = []
+    for ids in (ids1, ids2):
+        pos = np.searchsorted(ids, union)
+        found = pos < len(ids)
+        found[found] = ids[pos[found]] == union[found]
+        out.append(np.where(found, pos, -1).astype(np.int32))
+    return out[0], out[1]
+
+
+def linear(x: np.ndarray) -> np.ndarray:
+    """ Vectorized version of :func:`nevopy.activations.linear`. """
+    return x
+
+
+@jit(fastmath=True)
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    """ Vectorized version of :func:`nevopy.activations.sigmoid`. """
+    return 1 / (1 + np.exp(-np.minimum(np.maximum(x, -64.0), 64.0)))
+
+
+@jit(fastmath=True)
+def steepened_sigmoid(x: np.ndarray) -> np.ndarray:
+    """ Vectorized version of :func:`nevopy.activations.steepened_sigmoid`. """
+    return 1 / (1 + np.exp(-np.minimum(np.maximum(4.9 * x, -64.0), 64.0)))
+
+
+#: Number of activation functions supported by :func:`activate_nodes`. They
+#: are the first activation functions registered in :mod:`nevopy.neat.genes`
+#: (IDs 0: linear, 1: sigmoid and 2: steepened sigmoid).
+NUM_NATIVE_ACTIVATIONS = 3
+
+
+@jit(fastmath=True)
+def _activate(func_id: int, x: float) -> float:
+    """ Applies the native activation function with the given ID to `x`. """
+    if func_id == 1:
+        return 1 / (1 + np.exp(-min(max(x, -64.0), 64.0)))
+    if func_id == 2:
+        return 1 / (1 + np.exp(-min(max(4.9 * x, -64.0), 64.0)))
+    return x
+
+
+@jit(fastmath=True)
+def activate_nodes(nodes: np.ndarray,
+                   row_ptr: np.ndarray,
+                   col_idx: np.ndarray,
+                   conn_rows: np.ndarray,
+                   func_ids: np.ndarray,
+                   weights: np.ndarray,
+                   act: np.ndarray,
+                   scales: Optional[np.ndarray] = None) -> None:
+    """ Activates, in order, the given nodes.
+
+    The incoming connections of the nodes are expressed in the CSR format: the
+    connections heading to ``nodes[i]`` are the ones in the range
+    ``[row_ptr[i], row_ptr[i + 1])`` of `col_idx` (the rows of the source
+    nodes) and `conn_rows` (the rows of the connections, used to read their
+    weights). The weighted sum of a node's inputs and its activation function
+    are computed in a single pass.
+
+    The nodes must be ordered so that a node activated in the current pass has
+    its new activation read by the nodes after it and the previous one by the
+    nodes before it (the post-order used by :meth:`.NeatGenome.process`).
+
+    Args:
+        nodes (np.ndarray): The rows of the nodes to be activated.
+        row_ptr (np.ndarray): Offsets of each node's connections.
+        col_idx (np.ndarray): Rows of the source nodes of the connections.
+        conn_rows (np.ndarray): Rows of the connections.
+        func_ids (np.ndarray): IDs of the nodes' activation functions. Only the
+            first :attr:`NUM_NATIVE_ACTIVATIONS` IDs are supported.
+        weights (np.ndarray): The weights of the connections.
+        act (np.ndarray): The activations of the nodes. Updated in-place.
+        scales (Optional[np.ndarray]): If not `None`, the weights are quantized
+            and the weighted sum of a node's inputs is multiplied by the scale
+            of the node (see :meth:`.GenomeArrays.quantized_weights`).
+    """
+    for i in range(len(nodes)):
+        acc = 0.0
+        for k in range(row_ptr[i], row_ptr[i + 1]):
+            acc += weights[conn_rows[k]] * act[col_idx[k]]
+        if scales is not None:
+            acc *= scales[nodes[i]]
+        act[nodes[i]] = _activate(func_ids[i], acc)
@@ -194,6 +194,13 @@ class NeatConfig(ne.genetic_algorithm.config.GeneticAlgorithmConfig):
             considers its last output when calculating its new output.
         initial_node_activation (float): Initial activation value cached by a
             node when it's created or reset.
+        weights_precision (str): Precision of the weights used when feeding
+            inputs to a genome. If "float32", the weights are used as they are.
+            If "int8", the weights are quantized to 8-bit integers, with one
+            scale per node (see :meth:`.GenomeArrays.quantized_weights`),
+            which reduces the amount of memory read during the processing at
+            the cost of a small approximation error. Mutation, crossover and
+            distance calculations always use the full precision weights.
     """
 
     #: Attributes supported by the class and their default values. Each
@@ -239,9 +246,13 @@ class NeatConfig(ne.genetic_algorithm.config.GeneticAlgorithmConfig):
         # others
         reset_innovations_period=5,
         allow_self_connections=True,
-        initial_node_activation=0
+        initial_node_activation=0,
+        weights_precision="float32",
     )
 
+    #: Supported values of :attr:`.weights_precision`.
+    WEIGHTS_PRECISIONS = ("float32", "int8")
+
     #: Name of the attributes whose values change according to the mass
     #:  extinction counter (type: Tuple[float, float]).
     MAEX_KEYS = {"weight_mutation_chance",
@@ -255,3 +266,8 @@ class NeatConfig(ne.genetic_algorithm.config.GeneticAlgorithmConfig):
                  file_pathname=None,
                  **kwargs) -> None:
         super().__init__(file_pathname=file_pathname, **kwargs)
+        if self.weights_precision not in NeatConfig.WEIGHTS_PRECISIONS:
+            raise ValueError(
+                f"Invalid weights precision \"{self.weights_precision}\"! "
+                f"Supported values: {NeatConfig.WEIGHTS_PRECISIONS}."
+            )
@@ -24,8 +24,628 @@
 """ Implements the nodes (neurons) and edges (connections) of a genome.
 """
 
-from enum import Enum
-from typing import Callable, List, Optional, Tuple
+from enum import IntEnum
+import pickle
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import weakref
+
+import numpy as np
+
+from nevopy import activations
+from nevopy.neat import _kernels
+
+#: Types of node genes.
+INPUT, BIAS, HIDDEN, OUTPUT = range(4)
+
+#: Registered activation functions, indexed by their IDs.
+_ACT_FUNCTIONS = []  # type: List[Callable[[float], float]]
+
+#: Vectorized kernels of the registered activation functions, indexed by the
+#: functions IDs.
+_ACT_KERNELS = []  # type: List[Callable[[np.ndarray], np.ndarray]]
+
+#: Maps each registered activation function to its ID.
+_ACT_IDS = {}  # type: Dict[Callable[[float], float], int]
+
+#: Maps the pickled representation of each registered activation function (if
+#: it can be pickled) to its ID. Used to recognize copies of the registered
+#: functions, like the ones created when a genome is unpickled.
+_ACT_KEYS = {}  # type: Dict[bytes, int]
+
+#: Maps copies of registered activation functions (see :attr:`_ACT_KEYS`) to the
+#: IDs of the original functions. The copies aren't kept alive by the mapping.
+_ACT_ALIASES = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+#: Largest activation function ID that fits in
+#: :attr:`GenomeArrays.node_func_id`.
+_MAX_ACT_ID = np.iinfo(np.int16).max
+
+
+def _activation_key(func: Callable[[float], float]) -> Optional[bytes]:
+    """ Returns the pickled representation of the given activation function or
+    `None` if it can't be pickled or if it's pickled by reference.
+
+    Functions that can't be pickled by the standard :mod:`pickle` module (like
+    closures) are pickled with `cloudpickle`, if it's installed.
+
+    Functions pickled by reference (like module-level functions) are unpickled
+    as the object currently bound to their name, so their pickled
+    representation doesn't identify them: a redefined function (e.g., when a
+    notebook cell is re-run) has the same representation as the old one.
+    Since their copies are the function itself, they're recognized by
+    identity.
+    """
+    try:
+        key = pickle.dumps(func)
+    except Exception:  # pylint: disable=broad-except
+        try:
+            import cloudpickle  # pylint: disable=import-outside-toplevel
+            key = cloudpickle.dumps(func)
+        except Exception:  # pylint: disable=broad-except
+            return None
+    try:
+        by_reference = pickle.loads(key) is func
+    except Exception:  # pylint: disable=broad-except
+        return None
+    return None if by_reference else key
+
+
+def register_activation(
+        func: Callable[[float], float],
+        kernel: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+) -> int:
+    """ Registers an activation function, assigning an ID to it.
+
+    Node genes store the ID of their activation function instead of the
+    function itself. When processing inputs, the activations of all the nodes
+    that share an activation function are computed at once by the function's
+    vectorized kernel.
+
+    The functions in :mod:`nevopy.activations` are registered by default.
+    Other functions are registered the first time they are assigned to a node.
+    A function pickled by value (like a :func:`functools.partial` or a
+    closure) whose pickled representation is equal to the one of a registered
+    function (e.g., a copy of the function, created when a genome is
+    unpickled) is considered to be the same function.
+
+    Args:
+        func (Callable[[float], float]): The activation function. It should
+            receive a float as input and return a float as output.
+        kernel (Optional[Callable[[np.ndarray], np.ndarray]]): Vectorized
+            version of `func`. It should receive a numpy array as input and
+            return a numpy array (with the activations) as output. If `None`,
+            `func` is used directly if it's a numpy ufunc or wrapped by
+            :class:`numpy.vectorize` otherwise.
+
+    Returns:
+        The ID of the activation function. If the function has already been
+        registered, its current ID is returned.
+
+    Raises:
+        RuntimeError: If the maximum number of activation functions that can be
+            registered has been reached.
+    """
+    func_id = _ACT_IDS.get(func)
+    if func_id is not None:
+        return func_id
+    try:
+        func_id = _ACT_ALIASES.get(func)
+    except TypeError:  # the function can't be weakly referenced
+        pass
+    if func_id is not None:
+        return func_id
+
+    # checking if the function is a copy of a registered function
+    key = _activation_key(func)
+    func_id = _ACT_KEYS.get(key) if key is not None else None
+    if func_id is not None:
+        try:
+            _ACT_ALIASES[func] = func_id
+        except TypeError:
+            pass
+        return func_id
+
+    # registering a new function
+    func_id = len(_ACT_FUNCTIONS)
+    if func_id > _MAX_ACT_ID:
+        raise RuntimeError(
+            f"Can't register more than {_MAX_ACT_ID + 1} activation "
+            "functions! Make sure copies of the same function aren't being "
+            "created over and over (functions that can't be pickled aren't "
+            "recognized as copies of each other)."
+        )
+    if kernel is None:
+        kernel = (func if isinstance(func, np.ufunc)
+                  else np.vectorize(func, otypes=[np.float64]))
+    _ACT_FUNCTIONS.append(func)
+    _ACT_KERNELS.append(kernel)
+    _ACT_IDS[func] = func_id
+    if key is not None:
+        _ACT_KEYS[key] = func_id
+    return func_id
+
+
+def activation_function(func_id: int) -> Callable[[float], float]:
+    """ Returns the registered activation function with the given ID. """
+    return _ACT_FUNCTIONS[func_id]
+
+
+def activation_kernel(func_id: int) -> Callable[[np.ndarray], np.ndarray]:
+    """ Returns the vectorized kernel of the registered activation function with
+    the given ID.
+    """
+    return _ACT_KERNELS[func_id]
+
+
+def activate_batch(x: np.ndarray, func_ids: np.ndarray) -> np.ndarray:
+    """ Applies activation functions to a batch of inputs.
+
+    The inputs are grouped by activation function and each group is processed
+    by a single call to the function's vectorized kernel.
+
+    Args:
+        x (np.ndarray): The inputs.
+        func_ids (np.ndarray): The ID of the activation function to be applied
+            to each input.
+
+    Returns:
+        A numpy array with the activations.
+    """
+    out = np.empty(len(x), dtype=np.float64)
+    for func_id in np.unique(func_ids).tolist():
+        pos = np.flatnonzero(func_ids == func_id)
+        out[pos] = _ACT_KERNELS[func_id](x[pos])
+    return out
+
+
+register_activation(activations.linear, _kernels.linear)
+register_activation(activations.sigmoid, _kernels.sigmoid)
+register_activation(activations.steepened_sigmoid, _kernels.steepened_sigmoid)
+
+
+#: Shared (empty) initial value of the connections buffers of the nodes.
+_EMPTY_IDX = np.empty(0, dtype=np.int32)
+
+
+def _append_row(buffer: np.ndarray, length: int, row: int) -> np.ndarray:
+    """ Appends a row to a buffer whose first `length` positions are in use.
+
+    If the buffer is full, a new buffer, with twice the capacity, is allocated.
+
+    Returns:
+        The buffer containing the new row (the given buffer or a new one).
+    """
+    if length == len(buffer):
+        new_buffer = np.empty(max(4, 2 * length), dtype=np.int32)
+        new_buffer[:length] = buffer
+        buffer = new_buffer
+    buffer[length] = row
+    return buffer
+
+
+class ArrayPool:
+    """ Pool of reusable numpy arrays.
+
+    Arrays are rented from the pool instead of being allocated and, when no
+    longer needed, returned to it, so that they can be rented again. The
+    arrays are grouped in buckets according to their type and size (always a
+    power of 2). Rented arrays are not initialized.
+
+    Use :func:`array_pool` to get the pool of the current thread.
+
+    Args:
+        max_bucket_size (int): Maximum number of arrays kept in each bucket.
+            Arrays returned to a full bucket are discarded.
+    """
+
+    def __init__(self, max_bucket_size: int = 256) -> None:
+        self.max_bucket_size = max_bucket_size
+        self._buckets = {}  # type: Dict[Tuple[np.dtype, int], List[np.ndarray]]
+
+    def rent(self, dtype: Any, min_size: int) -> np.ndarray:
+        """ Rents an array with, at least, `min_size` elements.
+
+        Args:
+            dtype (Any): The type of the array's elements.
+            min_size (int): The minimum size of the array.
+
+        Returns:
+            An uninitialized 1D array. Its size is the smallest power of 2 not
+            smaller than `min_size`.
+        """
+        size = 1 << max(min_size - 1, 0).bit_length()
+        bucket = self._buckets.get((np.dtype(dtype), size))
+        if bucket:
+            return bucket.pop()
+        return np.empty(size, dtype=dtype)
+
+    def return_(self, arr: np.ndarray) -> None:
+        """ Returns an array to the pool.
+
+        The array must not be used anymore after it's returned. Views of other
+        arrays and arrays whose size isn't a power of 2 are ignored.
+        """
+        size = len(arr)
+        if size == 0 or size & (size - 1) or arr.base is not None:
+            return
+        bucket = self._buckets.setdefault((arr.dtype, size), [])
+        if len(bucket) < self.max_bucket_size:
+            bucket.append(arr)
+
+
+def _unreferenced(arr: np.ndarray) -> bool:
+    """ Checks whether the given array, referenced by a local variable of the
+    caller, isn't referenced anywhere else (including by views of it).
+
+    Arrays still referenced elsewhere must not be returned to an
+    :class:`.ArrayPool`. Always `False` if reference counts aren't available.
+    """
+    getrefcount = getattr(sys, "getrefcount", None)
+    # references: the caller's variable, `arr` and `getrefcount`'s argument
+    return getrefcount is not None and getrefcount(arr) <= 3
+
+
+#: Thread-local storage of the array pools.
+_POOLS = threading.local()
+
+
+def array_pool() -> ArrayPool:
+    """ Returns the :class:`.ArrayPool` of the current thread. """
+    pool = getattr(_POOLS, "pool", None)
+    if pool is None:
+        pool = _POOLS.pool = ArrayPool()
+    return pool
+
+
+class GenomeArrays:
+    """ Structure-of-Arrays (SoA) storage for the genes of a genome.
+
+    Instead of keeping each node and connection gene as a standalone Python
+    object, the attributes of all the genes of a genome are packed into
+    contiguous numpy arrays (one array per attribute). Instances of
+    :class:`.NodeGene` and :class:`.ConnectionGene` are thin views over a row of
+    these arrays. This allows the hot paths of NEAT (processing of inputs,
+    weight mutation and genome comparison) to be vectorized.
+
+    The arrays grow (by doubling their capacity) as new genes are added. Only
+    the first :attr:`num_nodes` / :attr:`num_connections` positions of the
+    arrays are valid. The arrays are rented from the thread's
+    :class:`.ArrayPool` and returned to it when replaced by larger ones or
+    when the storage is garbage collected, unless they (or views of them) are
+    still referenced elsewhere.
+
+    Args:
+        node_capacity (int): Initial capacity of the nodes arrays.
+        conn_capacity (int): Initial capacity of the connections arrays.
+
+    Attributes:
+        num_nodes (int): Number of node genes stored.
+        num_connections (int): Number of connection genes stored.
+        node_act (np.ndarray): Cached activation value of each node.
+        node_init_act (np.ndarray): Initial activation value of each node.
+        node_type (np.ndarray): Type of each node (:attr:`INPUT`,
+            :attr:`BIAS`, :attr:`HIDDEN` or :attr:`OUTPUT`).
+        node_func_id (np.ndarray): ID of the activation function of each node
+            (see :func:`.register_activation`).
+        conn_weight (np.ndarray): Weight of each connection.
+        conn_enabled (np.ndarray): Whether each connection is enabled or not.
+        conn_from (np.ndarray): Row (index in the nodes arrays) of the source
+            node of each connection.
+        conn_to (np.ndarray): Row (index in the nodes arrays) of the
+            destination node of each connection.
+        conn_innov (np.ndarray): Innovation ID of each connection.
+        topology_version (int): Counter incremented every time the topology of
+            the encoded network changes (new genes or enabling/disabling of
+            connections). Used to invalidate data cached from the arrays.
+        weights_version (int): Counter incremented every time the weights of
+            the connections change. Code that writes directly to
+            :attr:`conn_weight` must increment it.
+    """
+
+    _NODE_FIELDS = ("node_act", "node_init_act", "node_type", "node_func_id")
+    _CONN_FIELDS = ("conn_weight", "conn_enabled", "conn_from", "conn_to",
+                    "conn_innov")
+
+    def __init__(self,
+                 node_capacity: int = 16,
+                 conn_capacity: int = 16) -> None:
+        self.num_nodes = 0
+        self.num_connections = 0
+        self.topology_version = 0
+        # Weak references, so the connection genes (which reference this
+        # object) don't form reference cycles with it. This way, the arrays are
+        # returned to the pool as soon as the genome is discarded, instead of
+        # only when the garbage collector runs.
+        self._conn_refs = []  # type: List[weakref.ref]
+        self._sorted_ids = None  # type: Optional[Tuple[np.ndarray, ...]]
+        self._enabled_rows = None  # type: Optional[np.ndarray]
+        self._enabled_rows_version = -1
+        self.weights_version = 0
+        self._quantized = None  # type: Optional[Tuple[np.ndarray, ...]]
+        self._dequantized = None  # type: Optional[np.ndarray]
+        self._quantized_version = -1
+
+        pool = array_pool()
+        self.node_act = pool.rent(np.float32, node_capacity)
+        self.node_init_act = pool.rent(np.float32, node_capacity)
+        self.node_type = pool.rent(np.int8, node_capacity)
+        self.node_func_id = pool.rent(np.int16, node_capacity)
+
+        self.conn_weight = pool.rent(np.float32, conn_capacity)
+        self.conn_enabled = pool.rent(np.bool_, conn_capacity)
+        self.conn_from = pool.rent(np.int32, conn_capacity)
+        self.conn_to = pool.rent(np.int32, conn_capacity)
+        self.conn_innov = pool.rent(np.int64, conn_capacity)
+
+    def __del__(self) -> None:
+        pool = array_pool()
+        for name in GenomeArrays._NODE_FIELDS + GenomeArrays._CONN_FIELDS:
+            arr = self.__dict__.pop(name, None)
+            if arr is not None and _unreferenced(arr):
+                pool.return_(arr)
+
+    def _grow(self, fields: Tuple[str, ...], min_size: int) -> None:
+        """ Doubles the capacity of the given arrays until it's, at least,
+        equal to `min_size`.
+        """
+        capacity = len(getattr(self, fields[0]))
+        if min_size <= capacity:
+            return
+        new_capacity = max(capacity, 1)
+        while new_capacity < min_size:
+            new_capacity *= 2
+        pool = array_pool()
+        for name in fields:
+            old = self.__dict__.pop(name)
+            new = pool.rent(old.dtype, new_capacity)
+            new[:capacity] = old
+            setattr(self, name, new)
+            if _unreferenced(old):
+                pool.return_(old)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The IDs of the activation functions are only valid in the current
+        # process, so the functions themselves are pickled.
+        state = self.__dict__.copy()
+        state["_conn_refs"] = self.conn_genes
+        state["_act_functions"] = {
+            func_id: activation_function(func_id)
+            for func_id in np.unique(
+                self.node_func_id[:self.num_nodes]).tolist()
+        }
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        act_functions = state.pop("_act_functions")
+        self.__dict__.update(state)
+        self._conn_refs = [weakref.ref(c) for c in self._conn_refs]
+        # Out-of-band pickling (protocol 5, used by Ray, for example) might
+        # deserialize the arrays as read-only views of the received buffers.
+        for name in GenomeArrays._NODE_FIELDS + GenomeArrays._CONN_FIELDS:
+            arr = getattr(self, name)
+            if not arr.flags.writeable or arr.base is not None:
+                setattr(self, name, arr.copy())
+        node_func_id = self.node_func_id[:self.num_nodes]
+        old_ids = node_func_id.copy()
+        for old_id, func in act_functions.items():
+            new_id = register_activation(func)
+            if new_id != old_id:
+                node_func_id[old_ids == old_id] = new_id
+                self.topology_version += 1
+
+    @property
+    def conn_genes(self) -> List["ConnectionGene"]:
+        """ The connection gene (view) of each row of the connections arrays.
+
+        The genes are referenced weakly: they're owned by whoever created them
+        (usually a :class:`.NeatGenome`). Genes that no longer exist are
+        represented by `None`.
+        """
+        return [ref() for ref in self._conn_refs]
+
+    def connection_genes(self, rows: Iterable[int]) -> List["ConnectionGene"]:
+        """ Returns the connection genes (views) of the given rows of the
+        connections arrays, skipping genes that no longer exist (see
+        :attr:`conn_genes`).
+        """
+        refs = self._conn_refs
+        genes = [refs[i]() for i in rows]
+        return [c for c in genes if c is not None]
+
+    def add_connection_gene(self, connection: "ConnectionGene") -> None:
+        """ Registers the view of the last row allocated with
+        :meth:`add_connection`.
+        """
+        self._conn_refs.append(weakref.ref(connection))
+
+    def add_connection_genes(self,
+                             connections: List["ConnectionGene"]) -> None:
+        """ Registers the views of the rows allocated with
+        :meth:`copy_connections`, in order.
+        """
+        self._conn_refs.extend([weakref.ref(c) for c in connections])
+
+    def add_node(self,
+                 node_type: int,
+                 activation_func: Callable[[float], float],
+                 initial_activation: float) -> int:
+        """ Allocates a new row in the nodes arrays.
+
+        Returns:
+            The index of the row allocated for the new node.
+        """
+        idx = self.num_nodes
+        self._grow(GenomeArrays._NODE_FIELDS, idx + 1)
+        self.node_act[idx] = initial_activation
+        self.node_init_act[idx] = initial_activation
+        self.node_type[idx] = node_type
+        self.node_func_id[idx] = register_activation(activation_func)
+        self.num_nodes += 1
+        self.topology_version += 1
+        return idx
+
+    def copy_node(self, source: "GenomeArrays", source_idx: int) -> int:
+        """ Allocates a new row in the nodes arrays with a copy of a node stored
+        in another storage.
+
+        The new node's activation is set to its initial activation.
+
+        Args:
+            source (GenomeArrays): Storage where the node to be copied is.
+            source_idx (int): Row of the node to be copied in `source`.
+
+        Returns:
+            The index of the row allocated for the copy.
+        """
+        idx = self.num_nodes
+        self._grow(GenomeArrays._NODE_FIELDS, idx + 1)
+        self.node_act[idx] = source.node_init_act[source_idx]
+        self.node_init_act[idx] = source.node_init_act[source_idx]
+        self.node_type[idx] = source.node_type[source_idx]
+        self.node_func_id[idx] = source.node_func_id[source_idx]
+        self.num_nodes += 1
+        self.topology_version += 1
+        return idx
+
+    def add_connection(self,
+                       from_idx: int,
+                       to_idx: int,
+                       innov_id: int,
+                       weight: float,
+                       enabled: bool) -> int:
+        """ Allocates a new row in the connections arrays.
+
+        Returns:
+            The index of the row allocated for the new connection.
+        """
+        idx = self.num_connections
+        self._grow(GenomeArrays._CONN_FIELDS, idx + 1)
+        self.conn_weight[idx] = weight
+        self.conn_enabled[idx] = enabled
+        self.conn_from[idx] = from_idx
+        self.conn_to[idx] = to_idx
+        self.conn_innov[idx] = innov_id
+        self.num_connections += 1
+        self.topology_version += 1
+        self.weights_version += 1
+        self._sorted_ids = None
+        return idx
+
+    def copy_connections(self,
+                         source: "GenomeArrays",
+                         node_rows: np.ndarray) -> None:
+        """ Copies all the connections stored in another storage.
+
+        This storage must not contain connections yet, so each copy is
+        allocated in the same row as the original connection. The views of the
+        copies must be registered afterwards (see :meth:`add_connection_gene`).
+
+        Args:
+            source (GenomeArrays): Storage where the connections to be copied
+                are.
+            node_rows (np.ndarray): Maps the row of each node in `source` to
+                the row of its copy in this storage.
+        """
+        assert self.num_connections == 0
+        n = source.num_connections
+        self._grow(GenomeArrays._CONN_FIELDS, n)
+        self.conn_weight[:n] = source.conn_weight[:n]
+        self.conn_enabled[:n] = source.conn_enabled[:n]
+        self.conn_from[:n] = node_rows[source.conn_from[:n]]
+        self.conn_to[:n] = node_rows[source.conn_to[:n]]
+        self.conn_innov[:n] = source.conn_innov[:n]
+        self.num_connections = n
+        self.topology_version += 1
+        self.weights_version += 1
+        self._sorted_ids = None
+
+    def enabled_rows(self) -> np.ndarray:
+        """ Returns the rows of the enabled connections, in ascending order.
+
+        The result is cached (as a read-only array) until the topology of the
+        network changes (see :attr:`topology_version`). It allows disabled
+        connections to be skipped by gathering only the enabled rows, instead
+        of testing the flag of each connection.
+        """
+        if self._enabled_rows_version != self.topology_version:
+            rows = np.flatnonzero(self.conn_enabled[:self.num_connections])
+            rows.setflags(write=False)
+            self._enabled_rows = rows
+            self._enabled_rows_version = self.topology_version
+        return self._enabled_rows
+
+    def sorted_innovation_ids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the innovation IDs of the connections, sorted in ascending
+        order (see :func:`.sort_innovation_ids`), and the rows of the
+        connections in that order.
+
+        The result is cached (as read-only arrays) until a new connection is
+        added. Since the innovation ID of a connection never changes, enabling,
+        disabling or changing the weight of a connection doesn't invalidate it.
+        """
+        if self._sorted_ids is None:
+            ids, rows = sort_innovation_ids(
+                self.conn_innov[:self.num_connections])
+            ids.setflags(write=False)
+            rows.setflags(write=False)
+            self._sorted_ids = ids, rows
+        return self._sorted_ids
+
+    def seed_sorted_innovation_ids(self,
+                                   ids: np.ndarray,
+                                   rows: np.ndarray) -> None:
+        """ Sets the cached result of :meth:`sorted_innovation_ids`.
+
+        Used when the sorted IDs are known beforehand (the connections were
+        copied from a genome whose IDs are already sorted or were added in
+        ascending order of ID), so they don't need to be sorted again. Both
+        arrays are made read-only.
+        """
+        ids.setflags(write=False)
+        rows.setflags(write=False)
+        self._sorted_ids = ids, rows
+
+    def quantized_weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the weights of the connections quantized to 8-bit integers.
+
+        Each node has its own scale: the largest absolute weight among the
+        connections heading to it divided by 127. A connection's weight is
+        approximated by its quantized weight multiplied by the scale of its
+        destination node.
+
+        The result is cached (as read-only arrays) until the weights change
+        (see :attr:`weights_version`).
+
+        Returns:
+            A tuple with the quantized weight of each connection (`np.int8`)
+            and the scale of each node (`np.float32`).
+        """
+        if self._quantized_version != self.weights_version:
+            weights = self.conn_weight[:self.num_connections]
+            conn_to = self.conn_to[:self.num_connections]
+            scales = np.zeros(self.num_nodes, dtype=np.float32)
+            np.maximum.at(scales, conn_to, np.abs(weights) / 127)
+            q = np.rint(weights / np.where(scales > 0, scales, 1)[conn_to])
+            q = q.astype(np.int8)
+            dequantized = q * scales[conn_to]
+            for arr in (q, scales, dequantized):
+                arr.setflags(write=False)
+            self._quantized = q, scales
+            self._dequantized = dequantized
+            self._quantized_version = self.weights_version
+        return self._quantized
+
+    def dequantized_weights(self) -> np.ndarray:
+        """ Returns the 8-bit approximations of the weights of the connections
+        (see :meth:`quantized_weights`), as `np.float32`.
+
+        The result is cached (as a read-only array) until the weights change
+        (see :attr:`weights_version`).
+        """
+        self.quantized_weights()
+        return self._dequantized
 
 
 class NodeGene:
@@ -36,41 +656,57 @@ class NodeGene:
     has an activation function, which is applied to inputs received from other
     nodes of the network.
 
+    The node's data is stored in a row of a :class:`.GenomeArrays` instance,
+    usually the one owned by the genome the node belongs to. This class is just
+    a view over that row.
+
     Args:
         node_id (int): The node's identifier / innovation number.
-        node_type (NodeGene.Type): The node's type.
+        node_type (int): The node's type (:attr:`INPUT`, :attr:`BIAS`,
+            :attr:`HIDDEN` or :attr:`OUTPUT`). Members of
+            :class:`NodeGene.Type` are also accepted.
         activation_func (Callable[[float], float]): Activation function to be
             used by the node. It should receive a float as input and return a
             float (the resulting activation) as output.
         initial_activation (float): initial value of the node's activation (used
             when processing recurrent connections between nodes).
+        arrays (Optional[GenomeArrays]): Storage in which the node's data will
+            be allocated. If `None`, a new storage is created for the node.
 
-    Attributes:
-        in_connections (List[ConnectionGene]): List with the connections
-            (:class:`.ConnectionGene`) leaving this node, i.e., connections that
-            have this node as the source.
-        out_connections (List[ConnectionGene]): List with the connections
-            (:class:`.ConnectionGene`) coming to this node, i.e., connections
-            that have this node as the destination.
+    The connections of the node are stored as buffers with the rows (in the
+    node's :class:`.GenomeArrays`) of the connections, which grow (by doubling
+    their capacity) as new connections are added.
     """
 
+    __slots__ = ("_id", "_type", "_arrays", "_idx",
+                 "_in_idx", "_in_len", "_out_idx", "_out_len")
+
     def __init__(self,
                  node_id: int,
-                 node_type: "NodeGene.Type",
+                 node_type: int,
                  activation_func: Callable[[float], float],
-                 initial_activation: float) -> None:
+                 initial_activation: float,
+                 arrays: Optional[GenomeArrays] = None) -> None:
         assert node_id is not None
         self._id = node_id
-        self._type = node_type
-        self.initial_activation = initial_activation
-        self._activation = initial_activation
-        self.function = activation_func
-        self.in_connections = []   # type: List[ConnectionGene]
-        self.out_connections = []  # type: List[ConnectionGene]
+        self._type = int(node_type)
+        self._arrays = arrays if arrays is not None else GenomeArrays()
+        self._idx = self._arrays.add_node(node_type=self._type,
+                                          activation_func=activation_func,
+                                          initial_activation=initial_activation)
+        self._in_idx = _EMPTY_IDX
+        self._in_len = 0
+        self._out_idx = _EMPTY_IDX
+        self._out_len = 0
+
+    class Type(IntEnum):
+        """ Specifies the possible types of node genes.
 
-    class Type(Enum):
-        """ Specifies the possible types of node genes. """
-        INPUT, BIAS, HIDDEN, OUTPUT = range(4)
+        Kept for compatibility: the members are equal to the module-level
+        constants :attr:`INPUT`, :attr:`BIAS`, :attr:`HIDDEN` and
+        :attr:`OUTPUT`, which are used internally.
+        """
+        INPUT, BIAS, HIDDEN, OUTPUT = INPUT, BIAS, HIDDEN, OUTPUT
 
     @property
     def id(self) -> int:
@@ -85,17 +721,90 @@ class NodeGene:
         return self._id
 
     @property
-    def type(self) -> "NodeGene.Type":
-        """ Type of the node (input, bias, hidden or output). """
+    def type(self) -> int:
+        """ Type of the node (:attr:`INPUT`, :attr:`BIAS`, :attr:`HIDDEN` or
+        :attr:`OUTPUT`).
+        """
         return self._type
 
+    @property
+    def gene_arrays(self) -> GenomeArrays:
+        """ The :class:`.GenomeArrays` storing the node's data. """
+        return self._arrays
+
+    @property
+    def row(self) -> int:
+        """ Index of the node's row in the nodes arrays of its
+        :attr:`gene_arrays`.
+        """
+        return self._idx
+
     @property
     def activation(self) -> float:
         """
         The node's cached activation value, i.e., the node's output when it was
         last processed.
         """
-        return self._activation
+        return float(self._arrays.node_act[self._idx])
+
+    @property
+    def initial_activation(self) -> float:
+        """ Initial value of the node's activation. """
+        return float(self._arrays.node_init_act[self._idx])
+
+    @initial_activation.setter
+    def initial_activation(self, value: float) -> None:
+        self._arrays.node_init_act[self._idx] = value
+
+    @property
+    def function(self) -> Callable[[float], float]:
+        """ The node's activation function. """
+        return activation_function(self._arrays.node_func_id[self._idx])
+
+    @function.setter
+    def function(self, func: Callable[[float], float]) -> None:
+        self._arrays.node_func_id[self._idx] = register_activation(func)
+        self._arrays.topology_version += 1
+
+    @property
+    def in_idx(self) -> np.ndarray:
+        """ Rows (in the node's :class:`.GenomeArrays`) of the connections
+        coming to this node, i.e., connections that have this node as the
+        destination.
+        """
+        return self._in_idx[:self._in_len]
+
+    @property
+    def out_idx(self) -> np.ndarray:
+        """ Rows (in the node's :class:`.GenomeArrays`) of the connections
+        leaving this node, i.e., connections that have this node as the source.
+        """
+        return self._out_idx[:self._out_len]
+
+    @property
+    def in_connections(self) -> List["ConnectionGene"]:
+        """ List with the connections (:class:`.ConnectionGene`) coming to this
+        node, i.e., connections that have this node as the destination.
+        """
+        return self._arrays.connection_genes(self.in_idx.tolist())
+
+    @property
+    def out_connections(self) -> List["ConnectionGene"]:
+        """ List with the connections (:class:`.ConnectionGene`) leaving this
+        node, i.e., connections that have this node as the source.
+        """
+        return self._arrays.connection_genes(self.out_idx.tolist())
+
+    def add_in_connection(self, connection: "ConnectionGene") -> None:
+        """ Registers a connection that has this node as the destination. """
+        self._in_idx = _append_row(self._in_idx, self._in_len, connection.row)
+        self._in_len += 1
+
+    def add_out_connection(self, connection: "ConnectionGene") -> None:
+        """ Registers a connection that has this node as the source. """
+        self._out_idx = _append_row(self._out_idx, self._out_len,
+                                    connection.row)
+        self._out_len += 1
 
     def activate(self, x: float) -> None:
         """ Applies the node's activation function to the given input.
@@ -107,31 +816,56 @@ class NodeGene:
         Returns:
             None. The node's output is updated internally.
         """
-        self._activation = self.function(x)
+        self._arrays.node_act[self._idx] = self.function(x)
 
-    def simple_copy(self) -> "NodeGene":
-        """ Makes and returns a simple copy of this node.
+    def copy_connection_rows(self, node: "NodeGene") -> None:
+        """ Registers the rows of the connections of the given node as the rows
+        of this node's connections.
 
-        Wraps a call to this class' constructor.
+        Used when this node's storage holds copies of the connections of the
+        given node's storage, allocated in the same rows (see
+        :meth:`.GenomeArrays.copy_connections`).
+        """
+        self._in_idx = node.in_idx.copy()
+        self._in_len = len(self._in_idx)
+        self._out_idx = node.out_idx.copy()
+        self._out_len = len(self._out_idx)
+
+    def simple_copy(self,
+                    arrays: Optional[GenomeArrays] = None) -> "NodeGene":
+        """ Makes and returns a simple copy of this node.
 
         The copied node shares the same values for all the attributes of the
         source node, except for the connections. The copied node is created
-        without any connections.
+        without any connections. The constructor is bypassed: the node's row is
+        copied directly between the storages.
+
+        Args:
+            arrays (Optional[GenomeArrays]): Storage in which the copy will be
+                allocated. If `None`, a new storage is created for the copy.
 
         Returns:
             A copy of this node without any connection.
         """
-        return NodeGene(node_id=self._id,
-                        node_type=self._type,
-                        activation_func=self.function,
-                        initial_activation=self.initial_activation)
+        # pylint: disable=protected-access
+        if arrays is None:
+            arrays = GenomeArrays()
+
+        node = object.__new__(NodeGene)
+        node._id = self._id
+        node._type = self._type
+        node._arrays = arrays
+        node._idx = arrays.copy_node(self._arrays, self._idx)
+        node._in_idx = node._out_idx = _EMPTY_IDX
+        node._in_len = node._out_len = 0
+        return node
 
     def reset_activation(self) -> None:
         """
         Resets the node's activation value (it's cached output) to its initial
         value.
         """
-        self._activation = self.initial_activation
+        self._arrays.node_act[self._idx] = self._arrays.node_init_act[self._idx]
 
 
 class ConnectionGene:
@@ -140,6 +874,10 @@ class ConnectionGene:
     A connection gene represents/encodes a connection (edge) between two nodes
     (neurons) of a neural network (phenotype of a genome).
 
+    The connection's data is stored in a row of the :class:`.GenomeArrays`
+    instance of its nodes (both nodes must share the same storage). This class
+    is just a view over that row.
+
     Args:
         cid (int): The innovation number of the connection. As described in the
             original NEAT paper :cite:`stanley:ec02`, this serves as a
@@ -152,25 +890,72 @@ class ConnectionGene:
         weight (float): The weight of the connection.
         enabled (bool): Whether the initial state of the newly created
             connection should enabled or disabled.
-
-    Attributes:
-        weight (float): The weight of the connection.
-        enabled (bool): Whether the connection is enabled or not. A disabled
-            connection won't be considered during the computations of the neural
-            network.
     """
 
+    __slots__ = ("_id", "_from_node", "_to_node", "_arrays", "_idx",
+                 "__weakref__")
+
     def __init__(self,
                  cid: int,
                  from_node: NodeGene,
                  to_node: NodeGene,
                  weight: float,
                  enabled: bool = True) -> None:
+        assert from_node.gene_arrays is to_node.gene_arrays
         self._id = cid
         self._from_node = from_node
         self._to_node = to_node
-        self.weight = weight
-        self.enabled = enabled
+        self._arrays = from_node.gene_arrays
+        self._idx = self._arrays.add_connection(from_idx=from_node.row,
+                                                to_idx=to_node.row,
+                                                innov_id=cid,
+                                                weight=weight,
+                                                enabled=enabled)
+        self._arrays.add_connection_gene(self)
+
+    @classmethod
+    def _fast_new(cls,
+                  cid: int,
+                  from_node: NodeGene,
+                  to_node: NodeGene,
+                  weight: float,
+                  enabled: bool) -> "ConnectionGene":
+        """ Creates a new connection without going through the constructor.
+
+        Used when copying connections between genomes (deep copies and
+        crossover), where the arguments are known to be valid.
+        """
+        # pylint: disable=protected-access
+        assert from_node.gene_arrays is to_node.gene_arrays
+        conn = object.__new__(cls)
+        conn._id = cid
+        conn._from_node = from_node
+        conn._to_node = to_node
+        conn._arrays = arrays = from_node.gene_arrays
+        conn._idx = arrays.add_connection(from_node.row, to_node.row,
+                                          cid, weight, enabled)
+        arrays.add_connection_gene(conn)
+        return conn
+
+    @classmethod
+    def _view(cls,
+              cid: int,
+              from_node: NodeGene,
+              to_node: NodeGene,
+              row: int) -> "ConnectionGene":
+        """ Creates a view of a connection already allocated in the storage of
+        the given nodes (see :meth:`.GenomeArrays.copy_connections`).
+
+        The view isn't registered in the storage.
+        """
+        # pylint: disable=protected-access
+        conn = object.__new__(cls)
+        conn._id = cid
+        conn._from_node = from_node
+        conn._to_node = to_node
+        conn._arrays = from_node.gene_arrays
+        conn._idx = row
+        return conn
 
     @property
     def id(self) -> int:
@@ -194,6 +979,36 @@ class ConnectionGene:
         """ Node to where the connection is headed (destination node). """
         return self._to_node
 
+    @property
+    def row(self) -> int:
+        """ Index of the connection's row in the connections arrays of its
+        nodes' :class:`.GenomeArrays`.
+        """
+        return self._idx
+
+    @property
+    def weight(self) -> float:
+        """ The weight of the connection. """
+        return float(self._arrays.conn_weight[self._idx])
+
+    @weight.setter
+    def weight(self, value: float) -> None:
+        self._arrays.conn_weight[self._idx] = value
+        self._arrays.weights_version += 1
+
+    @property
+    def enabled(self) -> bool:
+        """ Whether the connection is enabled or not. A disabled connection
+        won't be considered during the computations of the neural network.
+        """
+        return bool(self._arrays.conn_enabled[self._idx])
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        if value != self._arrays.conn_enabled[self._idx]:
+            self._arrays.conn_enabled[self._idx] = value
+            self._arrays.topology_version += 1
+
     def self_connecting(self) -> bool:
         """
         Returns `True` if the connection is connecting a node to itself and
@@ -236,24 +1051,96 @@ def align_connections(
         (on one of the lists) and a `None` value (on the other list), the genes
         are either disjoint or excess.
     """
-    con_dict1 = {c.id: c for c in con_list1}
-    con_dict2 = {c.id: c for c in con_list2}
-    union = sorted(set(con_dict1.keys()) | set(con_dict2.keys()))
+    if not con_list1 or not con_list2:
+        # no genes to be matched: only the non-empty list must be sorted
+        con_list = con_list1 or con_list2
+        _, order = sort_innovation_ids(np.fromiter(
+            (c.id for c in con_list), dtype=np.int64, count=len(con_list)))
+        aligned = [con_list[i] for i in order.tolist()]
+        empty = [None] * len(aligned)  # type: List[Optional[ConnectionGene]]
+        aligned1, aligned2 = ((aligned, empty) if con_list1
+                              else (empty, aligned))
+    else:
+        ids1, order1 = sort_innovation_ids(np.fromiter(
+            (c.id for c in con_list1), dtype=np.int64, count=len(con_list1)))
+        ids2, order2 = sort_innovation_ids(np.fromiter(
+            (c.id for c in con_list2), dtype=np.int64, count=len(con_list2)))
+        idx1, idx2, _ = align_innovation_ids(ids1, ids2)
 
-    aligned1, aligned2 = [], []
-    for cid in union:
-        aligned1.append(con_dict1[cid] if cid in con_dict1 else None)
-        aligned2.append(con_dict2[cid] if cid in con_dict2 else None)
+        aligned1 = [con_list1[order1[i]] if i >= 0 else None
+                    for i in idx1.tolist()]
+        aligned2 = [con_list2[order2[i]] if i >= 0 else None
+                    for i in idx2.tolist()]
 
     # debug
     if print_alignment:
-        for c1, c2 in zip(aligned1, aligned2):
-            print(c1.id if c1 is not None else "-", end=" | ")
-            print(c2.id if c2 is not None else "-")
+        sys.stdout.write("".join(
+            f"{c1.id if c1 is not None else '-'} | "
+            f"{c2.id if c2 is not None else '-'}\n"
+            for c1, c2 in zip(aligned1, aligned2)
+        ))
 
     return aligned1, aligned2
 
 
+def sort_innovation_ids(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Sorts the given innovation IDs, as expected by
+    :func:`.align_innovation_ids`.
+
+    If an ID is repeated, only its last occurrence is considered.
+
+    Args:
+        ids (np.ndarray): Array with innovation IDs.
+
+    Returns:
+        A tuple containing the sorted (unique) IDs and their indices in the
+        given array.
+    """
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    last = np.ones(len(sorted_ids), dtype=np.bool_)
+    last[:-1] = sorted_ids[1:] != sorted_ids[:-1]
+    return sorted_ids[last], order[last]
+
+
+def align_innovation_ids(
+        ids1: np.ndarray,
+        ids2: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ Aligns the matching innovation IDs of the given arrays.
+
+    Array-based version of :func:`.align_connections`. Both arrays must be
+    sorted in ascending order and must not contain repeated IDs (see
+    :func:`.sort_innovation_ids`). The alignment is done through a single
+    linear merge of the arrays (or, for large arrays when `numba` isn't
+    available, through :func:`numpy.union1d` and :func:`numpy.searchsorted`).
+
+    Args:
+        ids1 (np.ndarray): The first sorted array of innovation IDs.
+        ids2 (np.ndarray): The second sorted array of innovation IDs.
+
+    Returns:
+        A tuple containing three arrays of the same size (the number of
+        distinct IDs in both arrays). Indices 0 and 1 contain, for each ID, its
+        index in `ids1` and in `ids2`, respectively, or -1 if the ID is missing
+        from the array. Index 2 contains a boolean mask indicating which IDs are
+        present in both arrays (matching genes).
+    """
+    if ids1 is ids2:
+        # same array (e.g., the cached IDs of a genome and of its copy)
+        idx = np.arange(len(ids1), dtype=np.int32)
+        return idx, idx, np.ones(len(ids1), dtype=np.bool_)
+
+    ids1 = np.asarray(ids1, dtype=np.int64)
+    ids2 = np.asarray(ids2, dtype=np.int64)
+    if (_kernels.numba is None
+            and len(ids1) + len(ids2) >= _kernels.NUMPY_MERGE_MIN_SIZE):
+        idx1, idx2 = _kernels.merge_sorted_ids_numpy(ids1, ids2)
+    else:
+        idx1, idx2 = _kernels.merge_sorted_ids(ids1, ids2)
+    return idx1, idx2, (idx1 >= 0) & (idx2 >= 0)
+
+
 class NodeIdException(Exception):
     """ Indicates that an attempt has been made to assign a new ID to a gene
     node that already has an ID.
@@ -30,7 +30,8 @@ the network it encodes. In NEAT, the genome is the entity subject to evolution.
 
 import logging
 import os
-from typing import Any, cast, Dict, List, Optional, Sequence, Tuple
+from typing import Any, cast, Dict, List, NamedTuple, Optional, Sequence
+from typing import Tuple
 
 import numpy as np
 np.warnings.filterwarnings("ignore", category=np.VisibleDeprecationWarning) \
@@ -38,10 +39,30 @@ np.warnings.filterwarnings("ignore", category=np.VisibleDeprecationWarning) \
 from tensorflow import reshape
 
 import nevopy as ne
+from nevopy.neat import _kernels
+from nevopy.neat.genes import BIAS, HIDDEN, INPUT, OUTPUT
 
 _logger = logging.getLogger(__name__)
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
 
+#: A level of the schedule used to activate the nodes of a genome (see
+#: :meth:`NeatGenome.evaluation_levels`). The nodes of a level only depend on
+#: the new activations of nodes of previous levels.
+EvalLevel = NamedTuple("EvalLevel", [
+    # rows (in the genome's gene arrays) of the level's nodes
+    ("nodes", np.ndarray),
+    # rows of the enabled connections heading to the level's nodes
+    ("edges", np.ndarray),
+    # position, in the level, of the destination node of each connection
+    ("local_dest", np.ndarray),
+    # whether each connection uses the new activation of its source node
+    # (instead of the previous one)
+    ("fresh", np.ndarray),
+    # pairs with the ID of an activation function and the positions (in the
+    # level) of the nodes that use it
+    ("act_groups", List[Tuple[int, np.ndarray]]),
+])
+
 
 class NeatGenome(ne.base_genome.BaseGenome):
     """ Linear representation of a neural network's connectivity.
@@ -83,10 +104,13 @@ class NeatGenome(ne.base_genome.BaseGenome):
             genes of the type :attr:`.NodeGene.Type.HIDDEN` in the genome.
         connections (:obj:`list` of :obj:`.ConnectionGene`): List with all the
             connection genes in the genome.
-        _existing_connections_dict (Dict[int, Set]): Used as a fast lookup table
-            to consult existing connections in the network. Given a node N, it
-            maps N's ID to the IDs of all the nodes that have a connection with
-            N as the source.
+        gene_arrays (GenomeArrays): Structure-of-Arrays storage holding the
+            data of all the genome's node and connection genes.
+        _existing_connections_dict (Dict[int, Dict[int, ConnectionGene]]): Used
+            as a fast lookup table to consult existing connections in the
+            network. Given a node N, it maps N's ID to a dictionary that maps
+            the IDs of all the nodes that have a connection with N as the source
+            to the corresponding connection.
     """
 
     def __init__(self,
@@ -98,6 +122,11 @@ class NeatGenome(ne.base_genome.BaseGenome):
         self._config = config
         self.species_id = None        # type: Optional[int]
         self._activated_nodes = None  # type: Optional[Dict[int, bool]]
+        self.gene_arrays = ne.neat.GenomeArrays()
+        self._eval_plan = None  # type: Optional[Tuple[Any, ...]]
+        self._eval_plan_version = -1
+        self._eval_levels = None  # type: Optional[List[EvalLevel]]
+        self._eval_levels_version = -1
 
         self.fitness = 0.0
         self.adj_fitness = 0.0
@@ -119,9 +148,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
             self.input_nodes.append(
                 ne.neat.NodeGene(
                     node_id=node_counter,
-                    node_type=ne.neat.NodeGene.Type.INPUT,
+                    node_type=INPUT,
                     activation_func=ne.activations.linear,
-                    initial_activation=self.config.initial_node_activation)
+                    initial_activation=self.config.initial_node_activation,
+                    arrays=self.gene_arrays)
             )
             node_counter += 1
 
@@ -129,9 +159,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
         if self.config.bias_value is not None:
             self.bias_node = ne.neat.NodeGene(
                 node_id=node_counter,
-                node_type=ne.neat.NodeGene.Type.BIAS,
+                node_type=BIAS,
                 activation_func=ne.activations.linear,
                 initial_activation=self.config.bias_value,
+                arrays=self.gene_arrays,
             )
             node_counter += 1
 
@@ -140,9 +171,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
         for _ in range(num_outputs):
             out_node = ne.neat.NodeGene(
                 node_id=node_counter,
-                node_type=ne.neat.NodeGene.Type.OUTPUT,
+                node_type=OUTPUT,
                 activation_func=self._output_activation,
                 initial_activation=self.config.initial_node_activation,
+                arrays=self.gene_arrays,
             )
             self.output_nodes.append(out_node)
             node_counter += 1
@@ -178,8 +210,9 @@ class NeatGenome(ne.base_genome.BaseGenome):
         to their initial value.
         """
         self._activated_nodes = None
-        for n in self.nodes():
-            n.reset_activation()
+        arrays = self.gene_arrays
+        arrays.node_act[:arrays.num_nodes] = \
+            arrays.node_init_act[:arrays.num_nodes]
 
     def reset(self) -> None:
         """ Wrapper for :meth:`.reset_activations`. """
@@ -215,27 +248,23 @@ class NeatGenome(ne.base_genome.BaseGenome):
         Returns:
             The distance between the genomes.
         """
-        genes = ne.neat.align_connections(self.connections, other.connections)
-        excess = disjoint = num_matches = 0
-        weight_diff = 0.0
-
-        g1_max_innov = np.amax([c.id for c in self.connections])
-        g2_max_innov = np.amax([c.id for c in other.connections])
-
-        for cn1, cn2 in zip(*genes):
-            # non-matching genes:
-            if cn1 is None or cn2 is None:
-                # if c1 is None, c2 can't be None (and vice-versa)
-                # noinspection PyUnresolvedReferences
-                if ((cn1 is None and cn2.id > g1_max_innov)
-                        or (cn2 is None and cn1.id > g2_max_innov)):
-                    excess += 1
-                else:
-                    disjoint += 1
-            # matching genes:
-            else:
-                num_matches += 1
-                weight_diff += abs(cn1.weight - cn2.weight)
+        ids1, rows1 = self.gene_arrays.sorted_innovation_ids()
+        ids2, rows2 = other.gene_arrays.sorted_innovation_ids()
+        idx1, idx2, matched = ne.neat.align_innovation_ids(ids1, ids2)
+
+        # non-matching genes: excess genes are the ones outside the range of
+        # the other genome's innovation numbers
+        only1 = ids1[idx1[idx2 < 0]]
+        only2 = ids2[idx2[idx1 < 0]]
+        excess = (int(np.count_nonzero(only1 > ids2[-1]))
+                  + int(np.count_nonzero(only2 > ids1[-1])))
+        disjoint = len(only1) + len(only2) - excess
+
+        # matching genes:
+        num_matches = int(np.count_nonzero(matched))
+        weights1 = self.gene_arrays.conn_weight[rows1[idx1[matched]]]
+        weights2 = other.gene_arrays.conn_weight[rows2[idx2[matched]]]
+        weight_diff = float(np.abs(weights1 - weights2).sum(dtype=np.float64))
 
         c1 = self.config.excess_genes_coefficient
         c2 = self.config.disjoint_genes_coefficient
@@ -256,10 +285,7 @@ class NeatGenome(ne.base_genome.BaseGenome):
             `True` if the specified connection exists in the genome's network
             and `False` otherwise.
         """
-        try:
-            return dest_id in self._existing_connections_dict[src_id]
-        except KeyError:
-            return False
+        return dest_id in self._existing_connections_dict.get(src_id, ())
 
     def add_connection(self,
                        cid: int,
@@ -286,13 +312,20 @@ class NeatGenome(ne.base_genome.BaseGenome):
                 already exists in the genome.
             ConnectionToBiasNodeError: If `dest_node` is an input or bias node
                 (nodes of these types do not process inputs!).
+            NodeNotInGenomeError: If `src_node` or `dest_node` isn't stored in
+                the genome's :attr:`gene_arrays`.
         """
+        for node in (src_node, dest_node):
+            if node.gene_arrays is not self.gene_arrays:
+                raise NodeNotInGenomeError(
+                    f"Attempt to create a connection ({src_node.id}->"
+                    f"{dest_node.id}) with a node ({node.id}) that doesn't "
+                    f"belong to the genome.")
         if self.connection_exists(src_node.id, dest_node.id):
             raise ConnectionExistsError(
                 f"Attempt to create an already existing connection "
                 f"({src_node.id}->{dest_node.id}).")
-        if (dest_node.type == ne.neat.NodeGene.Type.BIAS
-                or dest_node.type == ne.neat.NodeGene.Type.INPUT):
+        if dest_node.type == BIAS or dest_node.type == INPUT:
             raise ConnectionToBiasNodeError(
                 f"Attempt to create a connection pointing to a bias or input "
                 f"node ({src_node.id}->{dest_node.id}). Nodes of this type "
@@ -300,15 +333,26 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
         weight = (np.random.uniform(*self.config.new_weight_interval)
                   if weight is None else weight)
-        connection = ne.neat.ConnectionGene(cid=cid,
-                                            from_node=src_node,
-                                            to_node=dest_node,
-                                            weight=weight)
-
-        connection.enabled = enabled
+        self._add_connection_unchecked(cid, src_node, dest_node, enabled,
+                                       weight)
+
+    def _add_connection_unchecked(self,
+                                  cid: int,
+                                  src_node: "ne.neat.genes.NodeGene",
+                                  dest_node: "ne.neat.genes.NodeGene",
+                                  enabled: bool,
+                                  weight: float) -> None:
+        """ Adds a new connection gene to the genome without validating it.
+
+        Used by :meth:`.add_connection` and to copy connections whose validity
+        is already known (deep copies and crossover).
+        """
+        # pylint: disable=protected-access
+        connection = ne.neat.ConnectionGene._fast_new(cid, src_node, dest_node,
+                                                      weight, enabled)
         self.connections.append(connection)
-        src_node.out_connections.append(connection)
-        dest_node.in_connections.append(connection)
+        src_node.add_out_connection(connection)
+        dest_node.add_in_connection(connection)
 
         if src_node.id not in self._existing_connections_dict:
             self._existing_connections_dict[src_node.id] = {}
@@ -336,14 +380,14 @@ class NeatGenome(ne.base_genome.BaseGenome):
         np.random.shuffle(all_src_nodes)
 
         all_dest_nodes = [n for n in all_src_nodes
-                          if (n.type != ne.neat.NodeGene.Type.BIAS
-                              and n.type != ne.neat.NodeGene.Type.INPUT)]
+                          if n.type != BIAS and n.type != INPUT]
         np.random.shuffle(all_dest_nodes)
 
         for src_node in all_src_nodes:
+            existing = self._existing_connections_dict.get(src_node.id, ())
             for dest_node in all_dest_nodes:
                 if src_node != dest_node or self.config.allow_self_connections:
-                    if not self.connection_exists(src_node.id, dest_node.id):
+                    if dest_node.id not in existing:
                         cid = id_handler.next_connection_id(src_node.id,
                                                             dest_node.id)
                         self.add_connection(cid, src_node, dest_node)
@@ -352,10 +396,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
     def enable_random_connection(self) -> None:
         """ Randomly activates a disabled connection gene. """
-        disabled = [c for c in self.connections if not c.enabled]
+        num_conns = self.gene_arrays.num_connections
+        disabled = np.flatnonzero(~self.gene_arrays.conn_enabled[:num_conns])
         if len(disabled) > 0:
-            connection = np.random.choice(disabled)
-            connection.enabled = True
+            self.connections[np.random.choice(disabled)].enabled = True
 
     def add_random_hidden_node(self,
                                id_handler: "ne.neat.id_handler.IdHandler",
@@ -384,7 +428,8 @@ class NeatGenome(ne.base_genome.BaseGenome):
             wasn't possible to find a connection to "host" the new node. This
             usually happens when the ID handler hasn't been reset in a while.
         """
-        eligible_connections = [c for c in self.connections if c.enabled]
+        eligible_connections = [self.connections[row] for row in
+                                self.gene_arrays.enabled_rows().tolist()]
         if not eligible_connections:
             return None
         np.random.shuffle(eligible_connections)
@@ -402,9 +447,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
             original_connection.enabled = False
             new_node = ne.neat.NodeGene(
                 node_id=hid,
-                node_type=ne.neat.NodeGene.Type.HIDDEN,
+                node_type=HIDDEN,
                 activation_func=self._hidden_activation,
-                initial_activation=self.config.initial_node_activation
+                initial_activation=self.config.initial_node_activation,
+                arrays=self.gene_arrays,
             )
             self.hidden_nodes.append(new_node)
 
@@ -426,19 +472,24 @@ class NeatGenome(ne.base_genome.BaseGenome):
         """ Randomly mutates the weights of the genome's connections.
 
         Each connection gene in the genome has a chance to be perturbed, reset
-        or to remain unchanged.
+        or to remain unchanged. All the weights are mutated at once, directly in
+        the genome's :attr:`gene_arrays`.
         """
-        for connection in self.connections:
-            if ne.utils.chance(self.config.weight_reset_chance):
-                # perturbating the connection
-                connection.weight = np.random.uniform(
-                    *self.config.new_weight_interval)
-            else:
-                # resetting the connection
-                p = np.random.uniform(low=-self.config.weight_perturbation_pc,
-                                      high=self.config.weight_perturbation_pc)
-                d = connection.weight * p
-                connection.weight += d
+        num_conns = self.gene_arrays.num_connections
+        weights = self.gene_arrays.conn_weight[:num_conns]
+
+        # resetting the connections
+        reset = (np.random.uniform(low=0, high=1, size=num_conns)
+                 < self.config.weight_reset_chance)
+        new_weights = np.random.uniform(*self.config.new_weight_interval,
+                                        size=num_conns)
+
+        # perturbating the connections
+        p = np.random.uniform(low=-self.config.weight_perturbation_pc,
+                              high=self.config.weight_perturbation_pc,
+                              size=num_conns)
+        weights[:] = np.where(reset, new_weights, weights + weights * p)
+        self.gene_arrays.weights_version += 1
 
     def simple_copy(self) -> "NeatGenome":
         """ Makes a simple copy of the genome.
@@ -463,26 +514,45 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
         # creating required nodes
         for node in self.hidden_nodes:
-            new_node = node.simple_copy()
+            new_node = node.simple_copy(arrays=new_genome.gene_arrays)
             copied_nodes[node.id] = new_node
             new_genome.hidden_nodes.append(new_node)
 
-        # adding connections
-        for c in self.connections:
-            try:
-                new_genome.add_connection(
-                    cid=c.id,
-                    src_node=copied_nodes[c.from_node.id],
-                    dest_node=copied_nodes[c.to_node.id],
-                    enabled=c.enabled,
-                    weight=c.weight if not random_weights else None)
-            except ConnectionExistsError as e:
-                cons = [f"[{con.id}] {con.from_node.id}->{con.to_node.id} "
-                        f"({con.enabled})" for con in self.connections]
-                raise ConnectionExistsError(
-                    "Connection exists error when duplicating parent.\n"
-                    f"Source node's connections: {cons}") from e
-
+        # copying the connections (they're valid, since they're valid in the
+        # parent genome); they're allocated in the same rows as in the parent
+        parent_arrays, arrays = self.gene_arrays, new_genome.gene_arrays
+        node_rows = np.zeros(parent_arrays.num_nodes, dtype=np.int32)
+        copies = [None] * parent_arrays.num_nodes  # type: List[Any]
+        for node in self.nodes():
+            copy = copies[node.row] = copied_nodes[node.id]
+            node_rows[node.row] = copy.row
+            copy.copy_connection_rows(node)
+        arrays.copy_connections(parent_arrays, node_rows)
+        num_conns = arrays.num_connections
+        if random_weights:
+            arrays.conn_weight[:num_conns] = np.random.uniform(
+                *self.config.new_weight_interval, size=num_conns)
+            arrays.weights_version += 1
+
+        # creating the views of the copied connections
+        # pylint: disable=protected-access
+        new_view = ne.neat.ConnectionGene._view
+        existing = new_genome._existing_connections_dict
+        connections = new_genome.connections
+        for row, (cid, src_row, dest_row) in enumerate(zip(
+                parent_arrays.conn_innov[:num_conns].tolist(),
+                parent_arrays.conn_from[:num_conns].tolist(),
+                parent_arrays.conn_to[:num_conns].tolist())):
+            src_node, dest_node = copies[src_row], copies[dest_row]
+            connection = new_view(cid, src_node, dest_node, row)
+            connections.append(connection)
+            existing.setdefault(src_node.id, {})[dest_node.id] = connection
+        arrays.add_connection_genes(connections)
+
+        # the connections were copied in the same order, so the sorted
+        # innovation IDs of the copy are the same as the parent's
+        arrays.seed_sorted_innovation_ids(
+            *self.gene_arrays.sorted_innovation_ids())
         return new_genome
 
     def random_copy(self) -> "NeatGenome":
@@ -524,22 +594,32 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
         :math:`a = \\sigma (\\sum \\limits_{i} w_i \\cdot a_i)`
 
+        Each node is activated at most once per pass. A new pass starts on the
+        first call to this method after :meth:`.process` or
+        :meth:`.reset_activations` is called.
+
         Args:
             n (NodeGene): The node to be processed.
 
         Returns:
             The activation value (output) of the node.
         """
+        activated_nodes = self._activated_nodes
+        if activated_nodes is None:
+            activated_nodes = self._activated_nodes = {
+                m.id: False for m in self.output_nodes + self.hidden_nodes
+            }
+
         # checking if the node needs to be activated
-        if (n.type != ne.neat.NodeGene.Type.INPUT
-                and n.type != ne.neat.NodeGene.Type.BIAS
-                and not self._activated_nodes[n.id]):
+        if (n.type != INPUT
+                and n.type != BIAS
+                and not activated_nodes[n.id]):
             # activating the node
             # the current node (n) is immediately marked as activated; this is
             # needed due to recurrency: if, during the recursive calls, some
             # node m depends on the activation of n, the old activation of n
             # is used.
-            self._activated_nodes[n.id] = True
+            activated_nodes[n.id] = True
             zsum = 0.0
             for connection in n.in_connections:
                 if connection.enabled:
@@ -557,9 +637,20 @@ class NeatGenome(ne.base_genome.BaseGenome):
         is a Graph Neural Networks (GNN).
 
         Note:
-            The processing is done recursively, starting from the output nodes
-            (top-down approach). Because of that, nodes not connected to at
-            least one of the network's output nodes won't be processed.
+            The nodes are activated in the same order as in a recursive,
+            top-down traversal starting from the output nodes (see
+            :meth:`.process_node`). Because of that, nodes not connected to at
+            least one of the network's output nodes won't be processed. The
+            traversal isn't actually done on every call: a schedule is built
+            from the genome's topology (see :meth:`._build_eval_plan`) and
+            cached until the topology changes. It's executed either by a
+            compiled kernel (when `numba` is available) or level by level,
+            with vectorized numpy operations.
+
+        Note:
+            The weights of the connections and the activations of the nodes
+            are stored in single precision (`np.float32`), so the outputs only
+            have single precision, although they're returned as `np.float64`.
 
         Args:
             x (Sequence[float]): A sequence object (like a list or numpy array)
@@ -569,9 +660,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
                 of the neural network.
 
         Returns:
-            A numpy array containing the outputs of the network's output nodes.
-            The index `i` contains the activation value of the :math:`i^{th}`
-            output node of the network.
+            A numpy array (`np.float64`) containing the outputs of the network's
+            output nodes, computed in single precision. The index `i` contains
+            the activation value of the :math:`i^{th}` output node of the
+            network.
 
         Raises:
             InvalidInputError: If the number of elements in `X` doesn't match
@@ -584,23 +676,200 @@ class NeatGenome(ne.base_genome.BaseGenome):
                 f"but got {len(x)}."
             )
 
+        self._activated_nodes = None
+        arrays = self.gene_arrays
+        if self._eval_plan_version != arrays.topology_version:
+            self._eval_plan = self._build_eval_plan()
+            self._eval_plan_version = arrays.topology_version
+        in_rows, out_rows, csr, levels = self._eval_plan
+
         # preparing input nodes
-        for in_node, value in zip(self.input_nodes, x):
-            in_node.activate(value)
+        act = arrays.node_act
+        act[in_rows] = np.asarray(x, dtype=np.float32)
+
+        # compiled path: nodes activated one by one in a single kernel call
+        if csr is not None:
+            if self.config.weights_precision == "int8":
+                weights, scales = arrays.quantized_weights()
+                _kernels.activate_nodes(*csr, weights, act, scales)
+            else:
+                _kernels.activate_nodes(*csr, self.forward_weights(), act)
+            return act[out_rows].astype(np.float64)
 
-        # resetting activated nodes dict
-        self._activated_nodes = {
-            n.id: False
-            for n in self.output_nodes + self.hidden_nodes
-        }
+        prev_act = act.copy()
 
         # processing nodes in a top-down manner (starts from the output nodes)
         # nodes not connected to at least one output node are not processed
-        h = np.zeros(len(self.output_nodes))
-        for i, out_node in enumerate(self.output_nodes):
-            h[i] = self.process_node(out_node)
+        weights, conn_from = self.forward_weights(), arrays.conn_from
+        for nodes, edges, local_dest, fresh, act_groups in levels:
+            src = conn_from[edges]
+            z = np.bincount(
+                local_dest,
+                weights=weights[edges] * np.where(fresh, act[src],
+                                                  prev_act[src]),
+                minlength=len(nodes),
+            )
+            for func_id, pos in act_groups:
+                act[nodes[pos]] = ne.neat.genes.activation_kernel(func_id)(
+                    z[pos])
 
-        return h
+        return act[out_rows].astype(np.float64)
+
+    def input_rows(self) -> np.ndarray:
+        """ Returns the rows, in :attr:`.gene_arrays`, of the input nodes. """
+        return np.array([n.row for n in self.input_nodes], dtype=np.int64)
+
+    def output_rows(self) -> np.ndarray:
+        """ Returns the rows, in :attr:`.gene_arrays`, of the output nodes. """
+        return np.array([n.row for n in self.output_nodes], dtype=np.int64)
+
+    def evaluation_levels(self) -> List[EvalLevel]:
+        """ Returns the levels of the schedule used to activate the nodes.
+
+        Activating the levels in order, each level at once, is equivalent to
+        activating the nodes one by one, as done by :meth:`.process_node`. The
+        levels are cached until the topology of the network changes.
+        """
+        arrays = self.gene_arrays
+        if self._eval_levels_version != arrays.topology_version:
+            _, _, _, self._eval_levels = self._build_eval_plan(compiled=False)
+            self._eval_levels_version = arrays.topology_version
+        return self._eval_levels
+
+    def forward_weights(self) -> np.ndarray:
+        """ Returns the weights of the connections used when processing inputs.
+
+        The returned array has one weight per connection (in the order of
+        :attr:`.connections`). It's a view of the weights stored in
+        :attr:`.gene_arrays` or, if :attr:`.NeatConfig.weights_precision` is
+        "int8", a (read-only) array with their dequantized 8-bit
+        approximations.
+        """
+        precision = self.config.weights_precision
+        if precision == "int8":
+            return self.gene_arrays.dequantized_weights()
+        if precision == "float32":
+            arrays = self.gene_arrays
+            return arrays.conn_weight[:arrays.num_connections]
+        raise ValueError(
+            f"Invalid weights precision \"{precision}\"! Supported values: "
+            f"{ne.neat.NeatConfig.WEIGHTS_PRECISIONS}."
+        )
+
+    def _build_eval_plan(self, compiled: bool = True) -> Tuple[Any, ...]:
+        """ Builds the schedule used by :meth:`.process` to activate the nodes.
+
+        The nodes are activated in the same order as in :meth:`.process_node`:
+        starting from the output nodes, they are visited in a depth-first manner
+        and activated in post-order. Recurrences are solved by using the
+        previous activation of the "problematic" node.
+
+        A node only depends on the new activations of the nodes activated
+        before it. The nodes are grouped in levels, so that the nodes of a level
+        only depend on the new activations of nodes of previous levels. Because
+        of that, all the nodes of a level can be activated at once.
+
+        If `compiled` is `True`, `numba` is available and all the nodes use
+        natively supported activation functions, the nodes are activated one by
+        one, in post-order, by :func:`.activate_nodes`. In that case, a node
+        simply reads the current activation of its source nodes and no levels
+        are built.
+
+        Args:
+            compiled (bool): Whether the schedule for :func:`.activate_nodes`
+                can be built instead of the levels.
+
+        Returns:
+            A tuple containing the rows (in :attr:`.gene_arrays`) of the input
+            nodes, the rows of the output nodes, the arguments of
+            :func:`.activate_nodes` (or `None`) and a list with the levels
+            (see :class:`EvalLevel`).
+        """
+        arrays = self.gene_arrays
+        num_conns = arrays.num_connections
+        conn_from = arrays.conn_from[:num_conns].tolist()
+        conn_to = arrays.conn_to[:num_conns].tolist()
+        fixed_types = (INPUT, BIAS)
+        fixed = [t in fixed_types
+                 for t in arrays.node_type[:arrays.num_nodes].tolist()]
+
+        # enabled connections heading to each node, in insertion order
+        in_edges = {}  # type: Dict[int, List[int]]
+        for row in arrays.enabled_rows().tolist():
+            in_edges.setdefault(conn_to[row], []).append(row)
+
+        # depth-first visit (iterative version of `process_node`)
+        node_level = {}  # type: Dict[int, int]
+        edge_fresh = {}  # type: Dict[int, bool]
+        post_order = []  # type: List[int]
+        visited = set()
+        for out_node in self.output_nodes:
+            if out_node.row in visited:
+                continue
+            visited.add(out_node.row)
+            stack = [(out_node.row, 0)]
+            while stack:
+                node, i = stack[-1]
+                edges = in_edges.get(node, [])
+                if i < len(edges):
+                    stack[-1] = (node, i + 1)
+                    src = conn_from[edges[i]]
+                    if not fixed[src] and src not in visited:
+                        visited.add(src)
+                        stack.append((src, 0))
+                    continue
+
+                # all the node's dependencies have been visited
+                stack.pop()
+                level = 1
+                for row in edges:
+                    src = conn_from[row]
+                    edge_fresh[row] = src in node_level
+                    if edge_fresh[row]:
+                        level = max(level, node_level[src] + 1)
+                node_level[node] = level
+                post_order.append(node)
+
+        in_rows, out_rows = self.input_rows(), self.output_rows()
+
+        # compressed sparse row (CSR) layout for the compiled kernel
+        nodes = np.array(post_order, dtype=np.int64)
+        func_ids = arrays.node_func_id[nodes]
+        if (compiled and _kernels.numba is not None
+                and np.all(func_ids < _kernels.NUM_NATIVE_ACTIVATIONS)):
+            node_edges = [in_edges.get(n, []) for n in post_order]
+            row_ptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+            np.cumsum([len(e) for e in node_edges], out=row_ptr[1:])
+            conn_rows = np.array([r for e in node_edges for r in e],
+                                 dtype=np.int64)
+            col_idx = arrays.conn_from[conn_rows].astype(np.int64)
+            return (in_rows, out_rows,
+                    (nodes, row_ptr, col_idx, conn_rows, func_ids), [])
+
+        # grouping the nodes by level
+        levels = []
+        num_levels = max(node_level.values(), default=0)
+        for level in range(1, num_levels + 1):
+            nodes = [n for n, lv in node_level.items() if lv == level]
+            edges, local_dest = [], []
+            for pos, node in enumerate(nodes):
+                node_edges = in_edges.get(node, [])
+                edges += node_edges
+                local_dest += [pos] * len(node_edges)
+
+            nodes = np.array(nodes, dtype=np.int64)
+            func_ids = arrays.node_func_id[nodes]
+            act_groups = [(fid, np.flatnonzero(func_ids == fid))
+                          for fid in np.unique(func_ids).tolist()]
+            levels.append(EvalLevel(
+                nodes=nodes,
+                edges=np.array(edges, dtype=np.int64),
+                local_dest=np.array(local_dest, dtype=np.int64),
+                fresh=np.array([edge_fresh[e] for e in edges], dtype=np.bool_),
+                act_groups=act_groups,
+            ))
+
+        return in_rows, out_rows, None, levels
 
     def nodes(self) -> List["ne.neat.genes.NodeGene"]:
         """
@@ -625,13 +894,11 @@ class NeatGenome(ne.base_genome.BaseGenome):
             incoming connection and `False` otherwise. Self-connecting
             connections are not considered.
         """
+        arrays = self.gene_arrays
         for out_node in self.output_nodes:
-            valid = False
-            for in_con in out_node.in_connections:
-                if in_con.enabled and not in_con.self_connecting():
-                    valid = True
-                    break
-            if not valid:
+            rows = out_node.in_idx
+            if not np.any(arrays.conn_enabled[rows]
+                          & (arrays.conn_from[rows] != arrays.conn_to[rows])):
                 return False
         return True
 
@@ -646,13 +913,9 @@ class NeatGenome(ne.base_genome.BaseGenome):
             `True` if all the genome's input nodes are valid and `False`
             otherwise.
         """
+        enabled = self.gene_arrays.conn_enabled
         for in_node in self.input_nodes:
-            valid = False
-            for out_con in in_node.out_connections:
-                if out_con.enabled:
-                    valid = True
-                    break
-            if not valid:
+            if not np.any(enabled[in_node.out_idx]):
                 return False
         return True
 
@@ -692,7 +955,17 @@ class NeatGenome(ne.base_genome.BaseGenome):
             )
 
         # aligning matching genes
-        genes = ne.neat.align_connections(self.connections, other.connections)
+        # the row of a connection in `gene_arrays` is also its index in
+        # `connections`
+        ids1, rows1 = self.gene_arrays.sorted_innovation_ids()
+        ids2, rows2 = other.gene_arrays.sorted_innovation_ids()
+        idx1, idx2, _ = ne.neat.align_innovation_ids(ids1, ids2)
+        genes = (
+            [self.connections[rows1[i]] if i >= 0 else None
+             for i in idx1.tolist()],
+            [other.connections[rows2[i]] if i >= 0 else None
+             for i in idx2.tolist()],
+        )
 
         # new genome
         new_gen = self.simple_copy()
@@ -730,29 +1003,36 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
                 # adding the hidden nodes of the connection (if needed)
                 for node in (c.from_node, c.to_node):
-                    if (node.type == ne.neat.NodeGene.Type.HIDDEN
+                    if (node.type == HIDDEN
                             and node.id not in copied_nodes):
-                        new_node = node.simple_copy()
+                        new_node = node.simple_copy(
+                            arrays=new_gen.gene_arrays)
                         new_gen.hidden_nodes.append(new_node)
                         copied_nodes[node.id] = new_node
 
         # adding inherited connections
+        # pylint: disable=protected-access
         for c, enabled in chosen_connections:
             src_node = copied_nodes[c.from_node.id]
             dest_node = copied_nodes[c.to_node.id]
-            try:
-                new_gen.add_connection(cid=c.id,
-                                       src_node=src_node, dest_node=dest_node,
-                                       enabled=enabled, weight=c.weight)
-            except ConnectionExistsError:
-                # if this exception is raised, it means that the connection was
-                # already inherited from the other parent; this is possible
-                # because, in some cases, a connection between the same two
-                # nodes appears in different generations and are assigned,
-                # because of that, different IDs.
-                pass
+            if new_gen.connection_exists(src_node.id, dest_node.id):
+                # the connection was already inherited from the other parent;
+                # this is possible because, in some cases, a connection between
+                # the same two nodes appears in different generations and are
+                # assigned, because of that, different IDs.
                 # _debug_mating(genes, c, self, other, new_gen)
-                # raise ConnectionExistsError()
+                continue
+            new_gen._add_connection_unchecked(cid=c.id,
+                                              src_node=src_node,
+                                              dest_node=dest_node,
+                                              enabled=enabled,
+                                              weight=c.weight)
+
+        # the connections were inherited in ascending order of innovation ID
+        arrays = new_gen.gene_arrays
+        arrays.seed_sorted_innovation_ids(
+            arrays.conn_innov[:arrays.num_connections].copy(),
+            np.arange(arrays.num_connections))
         return new_gen
 
     def info(self) -> str:
@@ -762,7 +1042,8 @@ class NeatGenome(ne.base_genome.BaseGenome):
         """
         txt = ">> NODES ACTIVATIONS\n"
         for n in self.nodes():
-            txt += f"[{n.id}][{str(n.type).split('.')[1][0]}] {n.activation}\n"
+            type_name = ne.neat.NodeGene.Type(n.type).name
+            txt += f"[{n.id}][{type_name[0]}] {n.activation}\n"
         txt += "\n>> CONNECTIONS\n"
         for c in self.connections:
             txt += f"[{'ON' if c.enabled else 'OFF'}][{c.id}]" \
@@ -837,6 +1118,14 @@ class ConnectionToBiasNodeError(Exception):
     pass
 
 
+class NodeNotInGenomeError(Exception):
+    """
+    Exception that indicates that an attempt has been made to create a
+    connection with a node that doesn't belong to the genome.
+    """
+    pass
+
+
 class FixTopNeatGenome(NeatGenome):
     """ Integration of a NEAT genome with a fixed topology genome.
 
@@ -39,7 +39,7 @@ from nevopy.callbacks import CompleteStdOutLogger
 from nevopy.callbacks import History
 from nevopy.callbacks import SimpleStdOutLogger
 from nevopy.neat.config import NeatConfig
-from nevopy.neat.genes import NodeGene
+from nevopy.neat.genes import HIDDEN
 from nevopy.neat.genomes import NeatGenome
 from nevopy.neat.id_handler import IdHandler
 from nevopy.neat.species import NeatSpecies
@@ -286,12 +286,7 @@ class NeatPopulation(BasePopulation):
 
             # counting max number of hidden connections in one genome
             self.__max_hidden_connections = np.max([
-                len([c for c in g.connections
-                     if (c.enabled
-                         and (c.from_node.type == NodeGene.Type.HIDDEN
-                              or c.to_node.type == NodeGene.Type.HIDDEN))
-                     ])
-                for g in self.genomes
+                _count_hidden_connections(g) for g in self.genomes
             ])
 
             # callback: on_fitness_calculated
@@ -676,8 +671,9 @@ class NeatPopulation(BasePopulation):
         for g in self.genomes:
             invalid_out += 0 if g.valid_out_nodes() else 1
             no_hnode += 1 if len(g.hidden_nodes) == 0 else 0
-            no_cons += (0 if [c for c in g.connections
-                              if (c.enabled and not c.self_connecting())]
+            rows = g.gene_arrays.enabled_rows()
+            no_cons += (0 if np.any(g.gene_arrays.conn_from[rows]
+                                    != g.gene_arrays.conn_to[rows])
                         else 1)
 
         return (f"Size: {len(self.genomes)}\n"
@@ -685,3 +681,15 @@ class NeatPopulation(BasePopulation):
                 f"Invalid genomes (out nodes): {invalid_out}\n"
                 f"No-hidden node genomes: {no_hnode}\n"
                 f"No enabled connection (ignore self connections): {no_cons}")
+
+
+def _count_hidden_connections(genome: NeatGenome) -> int:
+    """ Counts the enabled connections of the genome that have a hidden node as
+    their source or destination.
+    """
+    arrays = genome.gene_arrays
+    rows = arrays.enabled_rows()
+    return int(np.count_nonzero(
+        (arrays.node_type[arrays.conn_from[rows]] == HIDDEN)
+        | (arrays.node_type[arrays.conn_to[rows]] == HIDDEN)
+    ))
@@ -377,10 +377,10 @@ def _nodes_activation_status(genome: "ne.neat.genomes.NeatGenome",
 
     for node in genome.nodes():
         # Bias node:
-        if node.type == ne.neat.NodeGene.Type.BIAS:
+        if node.type == ne.neat.genes.BIAS:
             status[node.id] = False
         # Output node:
-        elif node.type == ne.neat.NodeGene.Type.OUTPUT:
+        elif node.type == ne.neat.genes.OUTPUT:
             if output_activate_greatest_only and len(genome.output_nodes) > 1:
                 # noinspection PyUnboundLocalVariable
                 status[node.id] = node == max_out_node
@@ -393,7 +393,7 @@ def _nodes_activation_status(genome: "ne.neat.genomes.NeatGenome",
                     out_idx += 1
                     status[node.id] = info.is_activated(node.activation)
         # Input node:
-        elif node.type == node.type.INPUT:
+        elif node.type == ne.neat.genes.INPUT:
             if input_visualization_info is None:
                 status[node.id] = (node.activation
                                    > hidden_activation_threshold)
@@ -769,7 +769,7 @@ def visualize_activations(genome: "ne.neat.genomes.NeatGenome",
     for c in genome.connections:
         if (not c.enabled
             or abs(c.weight * c.from_node.activation) < 1e-3
-            or (c.from_node.type == ne.neat.NodeGene.Type.BIAS
+            or (c.from_node.type == ne.neat.genes.BIAS
                 and not draw_bias_node)):
             continue
 
@@ -788,7 +788,7 @@ def visualize_activations(genome: "ne.neat.genomes.NeatGenome",
 
     # Drawing nodes:
     for node in genome.nodes():
-        if node.type == ne.neat.NodeGene.Type.BIAS and not draw_bias_node:
+        if node.type == ne.neat.genes.BIAS and not draw_bias_node:
             continue
 
         # Border:
@@ -798,7 +798,7 @@ def visualize_activations(genome: "ne.neat.genomes.NeatGenome",
                                center=nodes_pos[node.id],
                                radius=node_radius + node_border_thickness)
         # Choosing the node's color:
-        color = (bias_node_color if node.type == ne.neat.NodeGene.Type.BIAS
+        color = (bias_node_color if node.type == ne.neat.genes.BIAS
                  else node_activated_color if node_activated[node.id]
                  else node_deactivated_color)
         # Drawing the node:
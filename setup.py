@@ -50,6 +50,12 @@ REQUIRED_PACKAGES = [
     "tensorflow ~= 2.4.0",
 ]
 
+# Optional packages, installed as extras (e.g., `pip install nevopy[numba]`).
+EXTRA_PACKAGES = {
+    # JIT-compilation of the low-level routines of the NEAT implementation.
+    "numba": ["numba ~= 0.52.0"],
+}
+
 # Packages which are only needed for testing code.
 TEST_PACKAGES = [
 
@@ -72,6 +78,7 @@ setuptools.setup(
     # Contained modules and scripts:
     packages=setuptools.find_packages(),
     install_requires=REQUIRED_PACKAGES,
+    extras_require=EXTRA_PACKAGES,
     tests_require=REQUIRED_PACKAGES + TEST_PACKAGES,
     # PyPI package information:
     classifiers=[
@@ -0,0 +1,481 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests the implementation of :class:`.NeatGenome` and of its genes.
+"""
+
+# pylint: disable=wrong-import-position
+import os
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "1"
+# pylint: enable=wrong-import-position
+
+import functools
+import gc
+import pickle
+import weakref
+
+import numpy as np
+import pytest
+
+import nevopy as ne
+
+_NUM_INPUTS = 5
+_NUM_OUTPUTS = 3
+_CONFIG = ne.neat.NeatConfig()
+
+
+def _relu(x):
+    return max(x, 0)
+
+
+def _random_genome(num_mutations=30):
+    id_handler = ne.neat.IdHandler(num_inputs=_NUM_INPUTS,
+                                   num_outputs=_NUM_OUTPUTS,
+                                   has_bias=True)
+    genome = ne.neat.NeatGenome(num_inputs=_NUM_INPUTS,
+                                num_outputs=_NUM_OUTPUTS,
+                                config=_CONFIG)
+    for _ in range(num_mutations):
+        if ne.utils.chance(0.5):
+            genome.add_random_hidden_node(id_handler)
+        else:
+            genome.add_random_connection(id_handler)
+        if ne.utils.chance(0.2):
+            np.random.choice(genome.connections).enabled = False
+    return genome
+
+
+def _reference_process(genome, x):
+    """ Processes the input using the recursive :meth:`.process_node`. """
+    for in_node, value in zip(genome.input_nodes, x):
+        in_node.activate(value)
+    genome._activated_nodes = None  # starts a new pass
+    return np.array([genome.process_node(n) for n in genome.output_nodes])
+
+
+def test_process(num_tests=50, num_inputs=5):
+    for _ in range(num_tests):
+        genome = _random_genome()
+        reference = genome.deep_copy()
+        for _ in range(num_inputs):
+            x = np.random.uniform(low=-1, high=1, size=_NUM_INPUTS)
+            h = genome.process(x)
+            h_ref = _reference_process(reference, x)
+            assert np.allclose(h, h_ref, atol=1e-5)
+            assert np.allclose(
+                [n.activation for n in genome.nodes()],
+                [n.activation for n in reference.nodes()],
+                atol=1e-5,
+            )
+        # a new pass of the recursive processing starts after `process`
+        assert isinstance(genome.process_node(genome.output_nodes[0]), float)
+
+
+def test_align_connections(num_tests=50):
+    for _ in range(num_tests):
+        g1, g2 = _random_genome(), _random_genome()
+        aligned1, aligned2 = ne.neat.align_connections(g1.connections,
+                                                       g2.connections)
+        ids1 = {c.id for c in g1.connections}
+        ids2 = {c.id for c in g2.connections}
+        union = sorted(ids1 | ids2)
+        assert len(aligned1) == len(aligned2) == len(union)
+        for cid, c1, c2 in zip(union, aligned1, aligned2):
+            assert (c1.id if c1 is not None else cid) == cid
+            assert (c2.id if c2 is not None else cid) == cid
+            assert (c1 is not None) == (cid in ids1)
+            assert (c2 is not None) == (cid in ids2)
+
+        # one of the lists is empty
+        aligned1, aligned2 = ne.neat.align_connections(g1.connections, [])
+        assert [c.id for c in aligned1] == sorted(ids1)
+        assert aligned2 == [None] * len(ids1)
+        aligned1, aligned2 = ne.neat.align_connections([], g2.connections)
+        assert aligned1 == [None] * len(ids2)
+        assert [c.id for c in aligned2] == sorted(ids2)
+
+        # the same (cached) array of IDs
+        ids = g1.gene_arrays.sorted_innovation_ids()[0]
+        idx1, idx2, matched = ne.neat.align_innovation_ids(ids, ids)
+        assert np.array_equal(idx1, np.arange(len(ids)))
+        assert np.array_equal(idx2, np.arange(len(ids)))
+        assert matched.all()
+
+
+def test_merge_sorted_ids(num_tests=200):
+    for _ in range(num_tests):
+        ids1 = np.unique(np.random.randint(0, 200, size=np.random.randint(50)))
+        ids2 = np.unique(np.random.randint(0, 200, size=np.random.randint(50)))
+        union = np.union1d(ids1, ids2)
+        for idx1, idx2 in (
+                ne.neat._kernels.merge_sorted_ids(ids1, ids2),
+                ne.neat._kernels.merge_sorted_ids_numpy(ids1, ids2)):
+            assert len(idx1) == len(idx2) == len(union)
+            assert np.array_equal(np.where(idx1 >= 0, ids1[idx1], union)
+                                  if len(ids1) else union, union)
+            assert np.array_equal(np.where(idx2 >= 0, ids2[idx2], union)
+                                  if len(ids2) else union, union)
+            assert np.array_equal(idx1 >= 0, np.isin(union, ids1))
+            assert np.array_equal(idx2 >= 0, np.isin(union, ids2))
+
+
+def test_distance(num_tests=50):
+    for _ in range(num_tests):
+        g1, g2 = _random_genome(), _random_genome()
+        aligned = ne.neat.align_connections(g1.connections, g2.connections)
+        max1 = max(c.id for c in g1.connections)
+        max2 = max(c.id for c in g2.connections)
+        excess = disjoint = num_matches = 0
+        weight_diff = 0.0
+        for c1, c2 in zip(*aligned):
+            if c1 is None or c2 is None:
+                if ((c1 is None and c2.id > max1)
+                        or (c2 is None and c1.id > max2)):
+                    excess += 1
+                else:
+                    disjoint += 1
+            else:
+                num_matches += 1
+                weight_diff += abs(c1.weight - c2.weight)
+
+        n = max(len(g1.connections), len(g2.connections))
+        expected = ((_CONFIG.excess_genes_coefficient * excess
+                     + _CONFIG.disjoint_genes_coefficient * disjoint) / n
+                    + _CONFIG.weight_difference_coefficient
+                    * weight_diff / num_matches)
+        assert np.isclose(g1.distance(g2), expected)
+
+
+def _check_sorted_innovation_ids(genome):
+    arrays = genome.gene_arrays
+    expected = ne.neat.genes.sort_innovation_ids(
+        arrays.conn_innov[:arrays.num_connections])
+    for cached, exp in zip(arrays.sorted_innovation_ids(), expected):
+        assert np.array_equal(cached, exp)
+
+
+def test_sorted_innovation_ids(num_tests=50):
+    id_handler = ne.neat.IdHandler(num_inputs=_NUM_INPUTS,
+                                   num_outputs=_NUM_OUTPUTS,
+                                   has_bias=True)
+    genome = _random_genome()
+    for _ in range(num_tests):
+        ids, rows = genome.gene_arrays.sorted_innovation_ids()
+        assert list(ids) == sorted({c.id for c in genome.connections})
+        assert [genome.connections[r].id for r in rows] == list(ids)
+        genome.add_random_hidden_node(id_handler)
+
+
+def test_mutate_weights(num_tests=50):
+    for _ in range(num_tests):
+        genome = _random_genome()
+        old_weights = [c.weight for c in genome.connections]
+        genome.mutate_weights()
+        new_weights = [c.weight for c in genome.connections]
+        assert len(old_weights) == len(new_weights)
+        assert not np.allclose(old_weights, new_weights)
+
+
+def test_custom_activation(num_tests=20):
+    config = ne.neat.NeatConfig(out_nodes_activation=np.tanh,
+                                hidden_nodes_activation=_relu)
+    for _ in range(num_tests):
+        genome = ne.neat.NeatGenome(num_inputs=_NUM_INPUTS,
+                                    num_outputs=_NUM_OUTPUTS,
+                                    config=config)
+        id_handler = ne.neat.IdHandler(num_inputs=_NUM_INPUTS,
+                                       num_outputs=_NUM_OUTPUTS,
+                                       has_bias=True)
+        for _ in range(10):
+            genome.add_random_hidden_node(id_handler)
+        reference = genome.deep_copy()
+        x = np.random.uniform(low=-1, high=1, size=_NUM_INPUTS)
+        assert np.allclose(genome.process(x), _reference_process(reference, x),
+                           atol=1e-5)
+
+
+def test_activate_batch(num_tests=20, size=100):
+    functions = [ne.activations.linear, ne.activations.sigmoid,
+                 ne.activations.steepened_sigmoid, np.tanh, _relu]
+    func_ids = np.array([ne.neat.register_activation(f) for f in functions])
+    for _ in range(num_tests):
+        x = np.random.uniform(low=-3, high=3, size=size)
+        choices = np.random.randint(len(functions), size=size)
+        h = ne.neat.activate_batch(x, func_ids[choices])
+        assert h.dtype == np.float64 and h.shape == x.shape
+        assert np.allclose(h, [functions[c](xi) for c, xi in zip(choices, x)],
+                           atol=1e-6)
+    assert len(ne.neat.activate_batch(np.empty(0), func_ids[:0])) == 0
+
+
+def test_pickle(num_tests=20):
+    for _ in range(num_tests):
+        genome = _random_genome()
+        x = np.random.uniform(low=-1, high=1, size=_NUM_INPUTS)
+        h = genome.process(x)
+        genome.reset_activations()
+        loaded = pickle.loads(pickle.dumps(genome))
+        assert np.allclose(h, loaded.process(x))
+
+        # out-of-band buffers are received as read-only memory
+        buffers = []
+        data = pickle.dumps(genome, protocol=5,
+                            buffer_callback=buffers.append)
+        loaded = pickle.loads(
+            data, buffers=[b.raw().toreadonly() for b in buffers])
+        assert np.allclose(h, loaded.process(x))
+
+
+def test_activation_registry(num_tests=100):
+    # copies of a registered function (created by unpickling) reuse its ID
+    config = ne.neat.NeatConfig(hidden_nodes_activation=functools.partial(
+        ne.activations.sigmoid, clip_value=10))
+    genome = ne.neat.NeatGenome(num_inputs=_NUM_INPUTS,
+                                num_outputs=_NUM_OUTPUTS,
+                                config=config)
+    id_handler = ne.neat.IdHandler(num_inputs=_NUM_INPUTS,
+                                   num_outputs=_NUM_OUTPUTS,
+                                   has_bias=True)
+    for _ in range(5):
+        genome.add_random_hidden_node(id_handler)
+    num_functions = len(ne.neat.genes._ACT_FUNCTIONS)
+    functions = [n.function for n in genome.nodes()]
+    data = pickle.dumps(genome)
+    for _ in range(num_tests):
+        loaded = pickle.loads(data)
+        assert [n.function for n in loaded.nodes()] == functions
+    assert len(ne.neat.genes._ACT_FUNCTIONS) == num_functions
+
+    # functions pickled by reference are only recognized by identity (e.g., a
+    # redefined function isn't a copy of the old one)
+    func_ids = []
+    for value in (0.0, 42.0):
+        def constant(_, value=value):
+            return value
+        constant.__qualname__ = constant.__name__ = "_redefined_activation"
+        globals()["_redefined_activation"] = constant
+        func_ids.append(ne.neat.register_activation(constant))
+    assert func_ids[0] != func_ids[1]
+    assert ne.neat.genes.activation_function(func_ids[1])(0) == 42.0
+    num_functions += 2
+
+    # the IDs must fit in the `node_func_id` column
+    max_id = ne.neat.genes._MAX_ACT_ID
+    ne.neat.genes._MAX_ACT_ID = num_functions - 1
+    try:
+        ne.neat.register_activation(lambda x: x)
+        assert False, "RuntimeError not raised!"
+    except RuntimeError:
+        pass
+    finally:
+        ne.neat.genes._MAX_ACT_ID = max_id
+
+
+def test_add_connection_foreign_node():
+    genome = _random_genome()
+    other = _random_genome()
+    standalone = ne.neat.NodeGene(node_id=100,
+                                  node_type=ne.neat.NodeGene.Type.HIDDEN,
+                                  activation_func=ne.activations.sigmoid,
+                                  initial_activation=0)
+    num_connections = len(genome.connections)
+    for node in (standalone, other.output_nodes[0]):
+        with pytest.raises(ne.neat.genomes.NodeNotInGenomeError):
+            genome.add_connection(100, genome.input_nodes[0], node)
+        with pytest.raises(ne.neat.genomes.NodeNotInGenomeError):
+            genome.add_connection(100, node, genome.output_nodes[0])
+    assert len(genome.connections) == num_connections
+    assert genome.gene_arrays.num_connections == num_connections
+
+
+def test_valid_nodes(num_tests=50):
+    for _ in range(num_tests):
+        genome = _random_genome()
+        for c in genome.connections:
+            c.enabled = ne.utils.chance(0.7)
+        valid_out = all(
+            any(c.enabled and not c.self_connecting() for c in n.in_connections)
+            for n in genome.output_nodes
+        )
+        valid_in = all(any(c.enabled for c in n.out_connections)
+                       for n in genome.input_nodes)
+        assert genome.valid_out_nodes() == valid_out
+        assert genome.valid_in_nodes() == valid_in
+
+
+def test_deep_copy(num_tests=50):
+    for _ in range(num_tests):
+        genome = _random_genome()
+        copy = genome.deep_copy()
+        assert copy.gene_arrays is not genome.gene_arrays
+        assert ([(c.id, c.weight, c.enabled) for c in genome.connections]
+                == [(c.id, c.weight, c.enabled) for c in copy.connections])
+        _check_sorted_innovation_ids(copy)
+        x = np.random.uniform(low=-1, high=1, size=_NUM_INPUTS)
+        assert np.allclose(genome.process(x), copy.process(x))
+
+        for g in (copy, genome.random_copy()):
+            assert g.gene_arrays.conn_genes == g.connections
+            assert ([(c.id, c.from_node.id, c.to_node.id)
+                     for c in genome.connections]
+                    == [(c.id, c.from_node.id, c.to_node.id)
+                        for c in g.connections])
+            assert all(g.connection_exists(c.from_node.id, c.to_node.id)
+                       for c in g.connections)
+            for node, node_copy in zip(genome.nodes(), g.nodes()):
+                assert ([c.id for c in node.in_connections]
+                        == [c.id for c in node_copy.in_connections])
+                assert ([c.id for c in node.out_connections]
+                        == [c.id for c in node_copy.out_connections])
+
+
+def test_mate(num_tests=50):
+    for _ in range(num_tests):
+        g1, g2 = _random_genome(), _random_genome()
+        g1.adj_fitness, g2.adj_fitness = np.random.uniform(size=2)
+        child = g1.mate(g2)
+        parents = {(c.id, c.weight) for c in g1.connections + g2.connections}
+        pairs = set()
+        for c in child.connections:
+            assert (c.id, c.weight) in parents
+            assert child.connection_exists(c.from_node.id, c.to_node.id)
+            assert c.from_node in child.nodes() and c.to_node in child.nodes()
+            pairs.add((c.from_node.id, c.to_node.id))
+        assert len(pairs) == len(child.connections)
+        assert child.gene_arrays.conn_genes == child.connections
+        _check_sorted_innovation_ids(child)
+
+
+def test_forward_population(num_genomes=30, num_inputs=5):
+    pytest.importorskip("cupy")
+    genomes = [_random_genome() for _ in range(num_genomes)]
+    references = [g.deep_copy() for g in genomes]
+    for _ in range(num_inputs):
+        x = np.random.uniform(low=-1, high=1,
+                              size=(num_genomes, _NUM_INPUTS))
+        h = ne.neat.forward_population(genomes, x)
+        h_ref = np.stack([g.process(xi) for g, xi in zip(references, x)])
+        assert np.allclose(h, h_ref, atol=1e-5)
+        for genome, reference in zip(genomes, references):
+            assert np.allclose([n.activation for n in genome.nodes()],
+                               [n.activation for n in reference.nodes()],
+                               atol=1e-5)
+    assert ne.neat.forward_population([], []).shape == (0, 0)
+
+    other = ne.neat.NeatGenome(num_inputs=_NUM_INPUTS,
+                               num_outputs=_NUM_OUTPUTS + 1,
+                               config=_CONFIG)
+    with pytest.raises(ValueError):
+        ne.neat.forward_population([genomes[0], other],
+                                   np.zeros((2, _NUM_INPUTS)))
+
+
+def test_int8_weights(num_tests=50):
+    config = ne.neat.NeatConfig(weights_precision="int8")
+    for _ in range(num_tests):
+        genome = _random_genome()
+        genome.config = config
+        reference = genome.deep_copy()
+        reference.config = _CONFIG
+        arrays = reference.gene_arrays
+        q, scales = genome.gene_arrays.quantized_weights()
+        arrays.conn_weight[:arrays.num_connections] = \
+            q * scales[arrays.conn_to[:arrays.num_connections]]
+
+        x = np.random.uniform(low=-1, high=1, size=_NUM_INPUTS)
+        assert np.allclose(genome.process(x), reference.process(x), atol=1e-5)
+        assert len(reference.forward_weights()) == arrays.num_connections
+        dequantized = genome.forward_weights()
+        assert genome.forward_weights() is dequantized
+        assert np.array_equal(
+            dequantized, arrays.conn_weight[:arrays.num_connections])
+        genome.mutate_weights()
+        assert genome.gene_arrays.quantized_weights()[0] is not q
+        assert genome.forward_weights() is not dequantized
+
+    with pytest.raises(ValueError):
+        ne.neat.NeatConfig(weights_precision="float16")
+
+
+def test_array_pool():
+    pool = ne.neat.ArrayPool(max_bucket_size=1)
+    arr = pool.rent(np.float32, 100)
+    assert len(arr) == 128 and arr.dtype == np.float32
+    pool.return_(arr)
+    pool.return_(np.empty(128, dtype=np.float32))
+    pool.return_(np.empty(256, dtype=np.float32)[:128])
+    assert pool.rent(np.float32, 65) is arr
+    assert pool.rent(np.float32, 65) is not arr
+    assert pool.rent(np.float64, 128) is not arr
+
+    # arrays still referenced elsewhere aren't pooled by the gene storages
+    id_handler = ne.neat.IdHandler(num_inputs=_NUM_INPUTS,
+                                   num_outputs=_NUM_OUTPUTS,
+                                   has_bias=True)
+    genome = _random_genome()
+    weights = genome.gene_arrays.conn_weight[:1]  # view
+    act = genome.gene_arrays.node_act
+    for _ in range(40):
+        genome.add_random_hidden_node(id_handler)
+    assert weights.base is not genome.gene_arrays.conn_weight
+    innov = genome.gene_arrays.conn_innov
+    del genome
+    pooled = [a for bucket in ne.neat.array_pool()._buckets.values()
+              for a in bucket]
+    assert not any(a is h for a in pooled for h in (weights.base, act, innov))
+
+
+def test_gene_arrays_release():
+    # the storage is freed (and its arrays pooled) without the cycle collector
+    gc.disable()
+    try:
+        genome = _random_genome().mate(_random_genome()).deep_copy()
+        genome.process(np.zeros(_NUM_INPUTS))
+        pickle.loads(pickle.dumps(genome))
+        ref = weakref.ref(genome.gene_arrays)
+        del genome
+        assert ref() is None
+    finally:
+        gc.enable()
+
+
+if __name__ == "__main__":
+    test_process()
+    test_align_connections()
+    test_merge_sorted_ids()
+    test_distance()
+    test_sorted_innovation_ids()
+    test_mutate_weights()
+    test_custom_activation()
+    test_activate_batch()
+    test_pickle()
+    test_activation_registry()
+    test_add_connection_foreign_node()
+    test_valid_nodes()
+    test_deep_copy()
+    test_mate()
+    test_int8_weights()
+    test_array_pool()
+    test_gene_arrays_release()
+    test_forward_population()  # skipped if CuPy isn't available
+    print("All tests passed!")